@@ -20,6 +20,25 @@ from collections import defaultdict
 import hashlib
 #from streamlit_autorefresh import st_autorefresh
 import base64
+from ephemeris import get_positions, calc_grahas, datetime_to_jd, GRAHA_NAMES, PositionCache, SID_MODE, sidereal_houses
+from ephemeris_service import EphemerisService
+from ephemeris_grid import load_grid
+from ephemeris_store import load_store
+from event_index import load_index
+from riseset import load_rise_set, all_districts, district_lagnas
+from parallel import make_pool
+from muhurta import load_muhurta
+from vargas import chart_vargas, varga_positions
+from dasha import (
+    DASHA_LEVELS, RASHI_LORDS, SIDEREAL_YEAR, VIMSHOTTARI, chara_system, chart_dashas
+)
+from panchang import panchang_calendar, panchang_at, with_times, jd_to_local
+from events import (
+    ASPECTS, DEFAULT_ASPECTS, HORIZON_CYCLES, aspect_table, aspect_kernel,
+    find_aspect_events, find_lunations, find_ingresses, find_stations,
+    iter_aspect_events, iter_ingresses, iter_lunations, iter_stations, next_events,
+    scan_all, indexed, RetroTimeline, WindowCache, LUNATIONS
+)
 
 def set_bg_image(image_path: str):
     with open(image_path, "rb") as f:
@@ -353,10 +372,76 @@ with st.sidebar:
         unsafe_allow_html=True
     )
 
-FLAGS = swe.FLG_SWIEPH | swe.FLG_SIDEREAL
-swe.set_sid_mode(swe.SIDM_LAHIRI)
-# Required for eclipse calculations
-swe.set_ephe_path(".")
+
+# Memory-mapped store (ephemeris_store.py), then Chebyshev grid
+# (ephemeris_grid.py), then live Swiss Ephemeris; the store is mapped
+# read-only so every worker process shares one copy in the page cache.
+# Live Swiss Ephemeris calls go through one process-wide LRU cache,
+# shared by every session, so its JD quantum is a startup setting
+# (POSITION_QUANTUM_SECONDS, default 1 s) rather than a per-visitor control.
+POSITION_QUANTUM = float(os.environ.get("POSITION_QUANTUM_SECONDS", 1.0))
+
+@st.cache_resource(show_spinner=False)
+def load_position_cache():
+    return PositionCache(quantum_seconds=POSITION_QUANTUM)
+
+POSITION_CACHE = load_position_cache()
+
+# swisseph settings (Lahiri, ephemeris path "." for eclipse
+# calculations) are per thread, so they belong to one service thread that
+# every session's live calls are queued to, instead of module-level
+# set_sid_mode / set_ephe_path on whichever thread runs the script.
+@st.cache_resource(show_spinner=False)
+def load_ephemeris_service():
+    return EphemerisService(SID_MODE, ephe_path=".", source=POSITION_CACHE.calc_grahas)
+
+SWE = load_ephemeris_service()
+
+@st.cache_resource(show_spinner=False)
+def load_ephemeris_backend():
+    return load_store(fallback=load_grid(fallback=SWE))
+
+EPHE = load_ephemeris_backend()
+
+# Precomputed events (event_index.py); the panels fall back to live
+# scans outside its span or when it has not been built.
+@st.cache_resource(show_spinner=False)
+def load_event_index():
+    return load_index()
+
+EVENT_INDEX = load_event_index()
+
+# Retrograde intervals around the selected year, built once per year and
+# shared by the chart's वक्री flags and the stations panel.
+@st.cache_resource(show_spinner=False)
+def load_retro_timeline(year):
+    jd_start, jd_end = swe.julday(year - 1, 1, 1, 0), swe.julday(year + 11, 1, 1, 0)
+    stations = None
+    if EVENT_INDEX is not None and EVENT_INDEX.covers(jd_start, jd_end):
+        stations = EVENT_INDEX.stations(jd_start, jd_end)
+    return RetroTimeline(jd_start, jd_end, EPHE, stations)
+
+# Sunrise / sunset / moonrise / moonset for a (location, year), computed
+# once and cached on disk under riseset/ (riseset.py).
+@st.cache_resource(show_spinner=False)
+def load_rise_set_table(location, year, lat, lon):
+    return load_rise_set(location, year, lat, lon,
+                         rise_trans=lambda *args: SWE.call(swe.rise_trans, *args))
+
+# Choghadiya / hora / kaal timelines (muhurta.py) for the selected date,
+# plus the day before so the hours before sunrise fall in its night.
+@st.cache_resource(show_spinner=False)
+def load_muhurta_timelines(location, date, lat, lon):
+    return load_muhurta(location, date - datetime.timedelta(days=1), date, lat, lon,
+                        rise_set=load_rise_set_table)
+
+# Year of tithi / nakshatra / yoga / karana segments and sunrise days for
+# one location (panchang.py), built once per (year, location); sunrise /
+# sunset come from the same cached tables as get_sun_moon_times.
+@st.cache_resource(show_spinner=False)
+def load_panchang(location, year, lat, lon):
+    return panchang_calendar(datetime.date(year, 1, 1), datetime.date(year, 12, 31),
+                             location, lat, lon, EPHE, rise_set=load_rise_set_table)
 
 
 # ================= SESSION DEFAULTS =================
@@ -410,29 +495,12 @@ def nakshatra_pada(lon):
     pada = int((lon % nak_size) // pada_size) + 1
     return NAKSHATRAS[idx][0], NAKSHATRAS[idx][1], pada
 
-def get_positions(dt_utc):
-    jd = swe.julday(dt_utc.year, dt_utc.month, dt_utc.day,
-                    dt_utc.hour + dt_utc.minute/60)
-
-    pos, retro = {}, {}
-    ay = swe.get_ayanamsa_ut(jd)
-
-    for name, code, sym in PLANETS:
-        r, _ = swe.calc_ut(jd, code)
-        lon = (r[0] - ay) % 360
-        pos[name] = lon
-        retro[name] = r[3] < 0
-
-    pos["केतु"] = (pos["राहु"] + 180) % 360
-    retro["केतु"] = retro["राहु"]
-
-    return pos, retro, jd
-
 
 def get_true_moon_lon_and_speed(jd):
-    ay = swe.get_ayanamsa_ut(jd)
+    ay = SWE.call(POSITION_CACHE.get_ayanamsa_ut, jd)
 
-    r, _ = swe.calc_ut(
+    r, _ = SWE.call(
+        POSITION_CACHE.calc_ut,
         jd,
         swe.MOON,
         swe.FLG_SWIEPH | swe.FLG_TRUEPOS | swe.FLG_SPEED
@@ -444,84 +512,15 @@ def get_true_moon_lon_and_speed(jd):
     return moon_lon, moon_speed
 
 
-def get_sun_moon_times(date, lat, lon):
-
-    jd = swe.julday(date.year, date.month, date.day, 0)
-
-    geopos = (lon, lat, 0)
-
-    rs = swe.rise_trans(jd, swe.SUN, swe.CALC_RISE | swe.BIT_DISC_CENTER, geopos)
-    ss = swe.rise_trans(jd, swe.SUN, swe.CALC_SET  | swe.BIT_DISC_CENTER, geopos)
-
-    mr = swe.rise_trans(jd, swe.MOON, swe.CALC_RISE, geopos)
-    ms = swe.rise_trans(jd, swe.MOON, swe.CALC_SET,  geopos)
-
-    def jd_to_time(res):
-
-        try:
-
-            if res[0] != 0:
-                return "—"
-
-        # Julian → calendar
-            y, m, d, h = swe.revjul(res[1][0])
-
-            hour = int(h)
-            minute = int((h - hour) * 60)
-
-        # UTC datetime
-            dt_utc = datetime.datetime(
-                y, m, d, hour, minute,
-                tzinfo=pytz.utc
-            )
-
-        # Convert to IST
-            dt_ist = dt_utc.astimezone(pytz.timezone("Asia/Kolkata"))
-
-            return dt_ist.strftime("%H:%M")
-
-        except:
-            return "—"
-
-    sunrise  = jd_to_time(rs)
-    sunset   = jd_to_time(ss)
-    moonrise = jd_to_time(mr)
-    moonset  = jd_to_time(ms)
-
-    return sunrise, sunset, moonrise, moonset
-TITHI_NAMES = ["प्रतिपदा","द्वितीया","तृतीया","चतुर्थी","पंचमी","षष्ठी","सप्तमी","अष्टमी","नवमी","दशमी","एकादशी","द्वादशी","त्रयोदशी","चतुर्दशी","पूर्णिमा","प्रतिपदा","द्वितीया","तृतीया","चतुर्थी","पंचमी","षष्ठी","सप्तमी","अष्टमी","नवमी","दशमी","एकादशी","द्वादशी","त्रयोदशी","चतुर्दशी","अमावस्या"]
-
-def get_tithi(moon_lon, sun_lon):
-
-    diff = (moon_lon - sun_lon) % 360
-    tithi_index = int(diff / 12)
-
-    return TITHI_NAMES[tithi_index]
-
-
-CHOGHADIYA_DAY = [
-"उद्वेग","चर","लाभ","अमृत",
-"काल","शुभ","रोग","उद्वेग"
-]
-
-def get_running_choghadiya(current_time, sunrise, sunset):
-
-    sr = datetime.datetime.strptime(sunrise,"%H:%M")
-    ss = datetime.datetime.strptime(sunset,"%H:%M")
-    now = datetime.datetime.strptime(current_time,"%H:%M")
-
-    day_duration = (ss - sr).seconds / 8
-
-    for i in range(8):
-        start = sr + datetime.timedelta(seconds=i*day_duration)
-        end = start + datetime.timedelta(seconds=day_duration)
-
-        if start <= now <= end:
-            return CHOGHADIYA_DAY[i]
-
-    return "रात्रि चोघड़िया"
+def get_sun_moon_times(date, location):
+    # aware IST datetimes (None if the body does not rise / set that day)
+    lat, lon = LOCATIONS[location]
+    times = load_rise_set_table(location, date.year, lat, lon).at(date)
+    return times["sunrise"], times["sunset"], times["moonrise"], times["moonset"]
 
 
+def hhmm(t):
+    return t.strftime("%H:%M") if t is not None else "—"
 
 
 def generate_svg(pos, retro):
@@ -650,9 +649,11 @@ ist = pytz.timezone("Asia/Kolkata")
 dt_ist = ist.localize(datetime.datetime.combine(date, time))
 dt_utc = dt_ist.astimezone(pytz.utc)
 
-pos, retro, jd = get_positions(dt_utc)
+pos, _, jd = get_positions(dt_utc, EPHE)
+RETRO = load_retro_timeline(dt_utc.year)
+retro = RETRO.retro_at(jd)
 
-ascmc, _ = swe.houses_ex(jd, LAT, LON, b'P', FLAGS)
+ascmc, _ = SWE.call(sidereal_houses, jd, LAT, LON, b'P', SWE.sid_mode)
 lagna_deg = ascmc[0] % 360
 lagna_sign = SIGNS[int(lagna_deg // 30)]
 
@@ -667,13 +668,25 @@ with right:
 
     moon_nak, moon_lord, moon_pada = nakshatra_pada(pos["चन्द्र"])
 
-    sunrise, sunset, moonrise, moonset = get_sun_moon_times(date, LAT, LON)
+    sunrise, sunset, moonrise, moonset = get_sun_moon_times(date, selected_location)
+
+    PANCHANG_SEGMENTS, PANCHANG_DAYS = load_panchang(selected_location, date.year, LAT, LON)
+    angas = panchang_at(PANCHANG_SEGMENTS, jd)
 
-    tithi = get_tithi(pos["चन्द्र"], pos["सूर्य"])
+    def anga_text(name):
+        row = angas[name]
+        return f"{row['name']} (→ {jd_to_local(row['end_jd']):%d-%b %H:%M})"
 
-    current_time_str = dt_ist.strftime("%H:%M")
+    MUHURTA = load_muhurta_timelines(selected_location, date, LAT, LON)
 
-    choghadiya = get_running_choghadiya(current_time_str, sunrise, sunset)
+    def slot_text(kind):
+        slot = MUHURTA[kind].at(jd)
+        return "—" if slot is None else f"{slot[0]} (→ {jd_to_local(slot[2]):%H:%M})"
+
+    def kaal_text(kind):
+        # the selected date's slot is the last one in the timeline
+        df = MUHURTA[kind].frame().iloc[-1]
+        return f"{df['start']:%H:%M} – {df['end']:%H:%M}"
 
     summary = [
         ["चन्द्र नक्षत्र", str(moon_nak)],
@@ -681,17 +694,48 @@ with right:
         ["नक्षत्र स्वामी", str(moon_lord)],
         ["लग्न", str(lagna_sign)],
         ["लग्न अंश", f"{lagna_deg:.2f}°"],
-        ["तिथि", tithi],
-        ["चोघड़िया (चल रहा)", choghadiya],
-        ["सूर्योदय", sunrise],
-        ["सूर्यास्त", sunset],
-        ["चंद्र उदय", moonrise],
-        ["चंद्र अस्त", moonset],
+        ["तिथि", anga_text("tithi")],
+        ["योग", anga_text("yoga")],
+        ["करण", anga_text("karana")],
+        ["चोघड़िया (चल रहा)", slot_text("choghadiya")],
+        ["होरा (चल रहा)", slot_text("hora")],
+        ["राहु काल", kaal_text("rahu_kaal")],
+        ["यमगण्ड", kaal_text("yamaganda")],
+        ["गुलिक काल", kaal_text("gulika")],
+        ["सूर्योदय", hhmm(sunrise)],
+        ["सूर्यास्त", hhmm(sunset)],
+        ["चंद्र उदय", hhmm(moonrise)],
+        ["चंद्र अस्त", hhmm(moonset)],
         ["समय (IST)", dt_ist.strftime("%d-%b-%Y %H:%M")]
     ]
 
     st.table(pd.DataFrame(summary, columns=["तत्व", "मान"]))
 
+    with st.expander("📅 पंचांग (इस माह)"):
+        month = with_times(PANCHANG_DAYS[
+            [d.month == date.month for d in PANCHANG_DAYS["date"]]
+        ])
+        hm = lambda col: month[col].dt.strftime("%H:%M")
+        st.dataframe(pd.DataFrame({
+            "दिनांक": month["date"],
+            "वार": month["vara"],
+            "सूर्योदय": hm("sunrise"),
+            "तिथि": month["paksha"] + " " + month["tithi"] + " → " + hm("tithi_end"),
+            "नक्षत्र": month["nakshatra"] + " → " + hm("nakshatra_end"),
+            "योग": month["yoga"] + " → " + hm("yoga_end"),
+            "करण": month["karana"] + " → " + hm("karana_end")
+        }), hide_index=True, use_container_width=True)
+
+    with st.expander("⏳ चोघड़िया / होरा (आज)"):
+        # the selected date's sunrise-to-sunrise slots close the timeline
+        for kind, title, n in (("choghadiya", "चोघड़िया", 16), ("hora", "होरा", 24)):
+            df = MUHURTA[kind].frame().iloc[-n:]
+            st.dataframe(pd.DataFrame({
+                title: df["name"],
+                "": df["period"].map({"day": "☀️", "night": "🌙"}),
+                "समय": df["start"].dt.strftime("%H:%M") + " – " + df["end"].dt.strftime("%H:%M")
+            }), hide_index=True, use_container_width=True)
+
     st.markdown('</div>', unsafe_allow_html=True)
 
 st.markdown('<div class="solid-card">', unsafe_allow_html=True)
@@ -723,80 +767,57 @@ st.table(pd.DataFrame(
 ))
 st.markdown('</div>', unsafe_allow_html=True)
 
-ZODIACS = [
-    "Aries","Taurus","Gemini","Cancer","Leo","Virgo",
-    "Libra","Scorpio","Sagittarius","Capricorn","Aquarius","Pisces"
-]
+# All INDIALL districts. Rise / set depend only on the date: a few hundred
+# ms of rise_trans calls, run on a process pool (workers set Lahiri and
+# the "." path themselves) so a new date never holds up the service
+# thread, and cached per date so time nudges don't redo it. The lagna
+# depends on the time, so it is computed only when asked for (one
+# service job, a few ms).
+@st.cache_resource(show_spinner=False)
+def load_district_pool():
+    return make_pool(sid_mode=SID_MODE, ephe_path=".")
 
-def angular_diff(a, b):
-    d = abs(a - b) % 360
-    return min(d, 360 - d)
 
-ASPECTS = {
-    "Conjunction": {z: z for z in ZODIACS},
-    "Opposition": {
-        "Aries": "Libra",
-        "Taurus": "Scorpio",
-        "Gemini": "Sagittarius",
-        "Cancer": "Capricorn",
-        "Leo": "Aquarius",
-        "Virgo": "Pisces",
-        "Libra": "Aries",
-        "Scorpio": "Taurus",
-        "Sagittarius": "Gemini",
-        "Capricorn": "Cancer",
-        "Aquarius": "Leo",
-        "Pisces": "Virgo"
-    }
-}
-
-def upcoming_aspects(start_dt_utc, days=5, step_minutes=30):
-    events = []
-    seen = set()
+@st.cache_data(show_spinner=False)
+def load_all_districts(date):
+    return all_districts(date, None, india_df, pool=load_district_pool())
 
-    total_steps = int((days * 24 * 60) / step_minutes)
-    prev_pos = None
 
-    for step in range(total_steps):
-        dt = start_dt_utc + datetime.timedelta(minutes=step * step_minutes)
-        pos, _, _ = get_positions(dt)
+@st.cache_data(show_spinner=False)
+def load_district_lagnas(jd):
+    return SWE.call(district_lagnas, jd, india_df, SWE.sid_mode)
+
+with st.expander("🗺️ सभी ज़िले — सूर्योदय / चंद्रोदय / लग्न"):
+    india = load_all_districts(date)
+    hm = lambda col: india[col].dt.strftime("%H:%M")
+    table = pd.DataFrame({
+        "ज़िला": india["District"],
+        "राज्य": india["State"],
+        "सूर्योदय": hm("sunrise"),
+        "सूर्यास्त": hm("sunset"),
+        "चंद्र उदय": hm("moonrise"),
+        "चंद्र अस्त": hm("moonset")
+    })
+    if st.toggle("चुने गए समय का लग्न भी दिखाएँ", key="district_lagna"):
+        table["लग्न"] = [f"{SIGNS[int(d // 30)]} {d % 30:.1f}°" for d in load_district_lagnas(jd)]
+    st.dataframe(table, hide_index=True, use_container_width=True)
 
-        if prev_pos is None:
-            prev_pos = pos
-            continue
+ZODIACS = [
+    "Aries","Taurus","Gemini","Cancer","Leo","Virgo",
+    "Libra","Scorpio","Sagittarius","Capricorn","Aquarius","Pisces"
+]
 
-        planets = list(pos.keys())
-
-        for i in range(len(planets)):
-            for j in range(i + 1, len(planets)):
-                p1, p2 = planets[i], planets[j]
-
-                prev_diff = angular_diff(prev_pos[p1], prev_pos[p2])
-                curr_diff = angular_diff(pos[p1], pos[p2])
-
-                if prev_diff > 1 and curr_diff <= 1:
-                    key = (p1, p2, "Conjunction")
-                    if key not in seen:
-                        seen.add(key)
-                        events.append({
-                            "aspect": "Conjunction",
-                            "planets": f"{p1} ☌ {p2}",
-                            "time": dt
-                        })
-
-                if prev_diff < 179 and curr_diff >= 179:
-                    key = (p1, p2, "Opposition")
-                    if key not in seen:
-                        seen.add(key)
-                        events.append({
-                            "aspect": "Opposition",
-                            "planets": f"{p1} ☍ {p2}",
-                            "time": dt
-                        })
-
-        prev_pos = pos
+def upcoming_aspects(start_dt_utc, days=5, table=None, cycles=None, index=None,
+                     window=None, ephe=calc_grahas):
+    jd = datetime_to_jd(start_dt_utc)
+    detect = indexed(index,
+                     lambda a, b: index.aspects(a, b, table, cycles),
+                     lambda a, b: find_aspect_events(a, b, table, ephe, cycles))
 
-    return events
+    # per-pair horizons move with the start, so they are not windowable
+    if window is None or cycles is not None:
+        return detect(jd, jd + days)
+    return window.query(detect, jd, jd + days)
 
 def unique_events(events):
     seen = set()
@@ -813,86 +834,79 @@ def unique_events(events):
 def zodiac_sign(deg):
     return ZODIACS[int(deg // 30)]
 
-def detect_aspects(pos):
+def detect_aspects(pos, names=DEFAULT_ASPECTS, drishti=False, mode="sign"):
+    table = aspect_table(names, drishti)
+    _, active, _ = aspect_kernel([[pos[p] for p in GRAHA_NAMES]], table, mode)
+
     events = []
+    for s in active[0].nonzero()[0]:
+        p1, p2 = GRAHA_NAMES[table["i"][s]], GRAHA_NAMES[table["j"][s]]
+        s1, s2 = zodiac_sign(pos[p1]), zodiac_sign(pos[p2])
+        name, symbol = table["name"][s], table["symbol"][s]
 
-    planets = list(pos.keys())
+        if name == "Conjunction":
+            events.append(f"{p1} {symbol} {p2} (Conjunction in {s1})")
+        else:
+            events.append(f"{p1} {symbol} {p2} ({name} {s1}–{s2})")
 
-    for i in range(len(planets)):
-        for j in range(i + 1, len(planets)):
-            p1, p2 = planets[i], planets[j]
-            s1 = zodiac_sign(pos[p1])
-            s2 = zodiac_sign(pos[p2])
+    return events
 
-            if s1 == s2:
-                events.append(f"{p1} ☌ {p2} (Conjunction in {s1})")
-            elif ASPECTS["Opposition"].get(s1) == s2:
-                events.append(f"{p1} ☍ {p2} (Opposition {s1}–{s2})")
+def detect_amavasya_purnima(start_dt_utc, days=30, index=None, window=None, ephe=calc_grahas):
+    jd = datetime_to_jd(start_dt_utc)
+    detect = indexed(index,
+                     lambda a, b: index.lunations(a, b),
+                     lambda a, b: find_lunations(a, b, ephe))
 
-    return events
+    if window is None:
+        return detect(jd, jd + days)
+    return window.query(detect, jd, jd + days)
 
-def moon_sun_diff(moon_deg, sun_deg):
-    diff = (moon_deg - sun_deg) % 360
-    return min(diff, 360 - diff)
+def upcoming_stations(start_dt_utc, days=30, timeline=None, index=None, ephe=calc_grahas):
+    jd = datetime_to_jd(start_dt_utc)
+    if timeline is not None and timeline.covers(jd) and timeline.covers(jd + days):
+        return timeline.between(jd, jd + days)
+    if index is not None and index.covers(jd, jd + days):
+        return index.stations(jd, jd + days)
+    return find_stations(jd, jd + days, ephe=ephe)
 
-def detect_amavasya_purnima(start_dt_utc, days=30, step_minutes=15):
-    events = {
-        "Amavasya": {"start": None, "end": None},
-        "Purnima": {"start": None, "end": None}
-    }
+NAK_SIZE = 13 + 1/3
 
-    total_steps = int((days * 24 * 60) / step_minutes)
-
-    prev_diff = None
-
-    for step in range(total_steps):
-        dt = start_dt_utc + datetime.timedelta(minutes=step * step_minutes)
-        pos, _, _ = get_positions(dt)
-
-        moon = pos["चन्द्र"]
-        sun = pos["सूर्य"]
-        diff = moon_sun_diff(moon, sun)
-
-        if (
-            prev_diff is not None
-            and prev_diff > 12
-            and diff <= 12
-            and events["Amavasya"]["start"] is None
-        ):
-            events["Amavasya"]["start"] = dt
-
-        if (
-            events["Amavasya"]["start"]
-            and prev_diff is not None
-            and prev_diff > 0.5
-            and diff <= 0.5
-            and events["Amavasya"]["end"] is None
-        ):
-            events["Amavasya"]["end"] = dt
-
-        if (
-            prev_diff is not None
-            and prev_diff < 168
-            and diff >= 168
-            and events["Purnima"]["start"] is None
-        ):
-            events["Purnima"]["start"] = dt
-
-        if (
-            events["Purnima"]["start"]
-            and prev_diff is not None
-            and prev_diff < 179.5
-            and diff >= 179.5
-            and events["Purnima"]["end"] is None
-        ):
-            events["Purnima"]["end"] = dt
-
-        prev_diff = diff
-
-        if all(v["end"] for v in events.values()):
-            break
+def zodiac_index(deg):
+    return int(deg // 30)
 
-    return events
+def nakshatra_index(deg):
+    return int(deg // NAK_SIZE)
+
+def zodiac_name(deg):
+    return SIGNS[zodiac_index(deg)]
+
+def nakshatra_name(deg):
+    return NAKSHATRAS[nakshatra_index(deg)][0]
+
+FAST_PLANETS = ["चन्द्र", "बुध", "शुक्र", "सूर्य"]
+
+def ingress_cell_name(level, idx):
+    if level == "sign":
+        return SIGNS[idx]
+    if level == "nakshatra":
+        return NAKSHATRAS[idx][0]
+    return f"{NAKSHATRAS[idx // 4][0]} (पद {idx % 4 + 1})"
+
+def upcoming_sign_nakshatra_changes(start_dt_utc, days=10, planets=FAST_PLANETS,
+                                    levels=("sign", "nakshatra"), index=None,
+                                    window=None, ephe=calc_grahas):
+    jd = datetime_to_jd(start_dt_utc)
+    detect = indexed(index,
+                     lambda a, b: index.ingresses(a, b, planets, levels),
+                     lambda a, b: find_ingresses(a, b, planets, levels, ephe))
+
+    events = detect(jd, jd + days) if window is None else window.query(detect, jd, jd + days)
+
+    # copies, so events held by a WindowCache keep their cell indices
+    return [dict(e, **{
+        "from": ingress_cell_name(e["level"], e["from"]),
+        "to": ingress_cell_name(e["level"], e["to"])
+    }) for e in events]
 
 ASPECT_STYLE = {
     "Conjunction": {
@@ -902,43 +916,126 @@ ASPECT_STYLE = {
     "Opposition": {
         "icon": "🔴",
         "color": "#e74c3c"
+    },
+    "Trine": {
+        "icon": "🔵",
+        "color": "#3498db"
+    },
+    "Square": {
+        "icon": "🟠",
+        "color": "#e67e22"
+    },
+    "Sextile": {
+        "icon": "🟣",
+        "color": "#9b59b6"
+    },
+    "Drishti": {
+        "icon": "🟡",
+        "color": "#f1c40f"
     }
 }
 
+# ================= TIME-WINDOW SCANS =================
+# One shared sample stream feeds every panel below, so each instant is
+# computed once per rerun.
+sc1, sc2, sc3 = st.columns([1, 2, 1])
+aspect_days = sc1.selectbox(
+    "युति / प्रतियुति अवधि (दिन)",
+    [10, 30, 90, 365, 365*5],
+    index=0
+)
+aspect_auto = sc1.checkbox(
+    "प्रति-युग्म अवधि (Auto horizon)",
+    value=False,
+    help="Each pair is scanned for one full synodic cycle (capped at the period above): "
+         "about a month for Moon pairs, up to decades for गुरु–शनि."
+)
+transit_planets = sc2.multiselect("ग्रह", GRAHA_NAMES, default=FAST_PLANETS)
+transit_days = sc3.selectbox("गोचर अवधि (दिन)", [10, 30, 90, 365, 365*5], index=0)
+
+ac1, ac2 = st.columns([3, 1])
+aspect_names = ac1.multiselect("दृष्टि (Aspects)", list(ASPECTS), default=list(DEFAULT_ASPECTS))
+aspect_drishti = ac2.checkbox("विशेष दृष्टि (मंगल / गुरु / शनि)", value=False)
+aspect_set = aspect_table(aspect_names, drishti=aspect_drishti)
+
+# Each scan keeps its last window per session; nudging the time only
+# scans the newly exposed edge. A settings change starts a fresh window.
+def session_window(name, *config):
+    windows = st.session_state.setdefault("scan_windows", {})
+    if name not in windows or windows[name][0] != config:
+        windows[name] = (config, WindowCache())
+    return windows[name][1]
+
+scan_windows = {
+    "lunations": session_window("lunations"),
+    "aspects": session_window("aspects", tuple(aspect_names), aspect_drishti, aspect_auto),
+    "ingresses": session_window("ingresses", tuple(transit_planets))
+}
+
+scan_results, scan_timings = scan_all({
+    "lunations": lambda ephe: detect_amavasya_purnima(
+        dt_utc, days=30, index=EVENT_INDEX, window=scan_windows["lunations"], ephe=ephe
+    ),
+    "aspects": lambda ephe: upcoming_aspects(
+        dt_utc, days=aspect_days, table=aspect_set,
+        cycles=HORIZON_CYCLES if aspect_auto else None, index=EVENT_INDEX,
+        window=scan_windows["aspects"], ephe=ephe
+    ),
+    "ingresses": lambda ephe: upcoming_sign_nakshatra_changes(
+        dt_utc, days=transit_days, planets=transit_planets, index=EVENT_INDEX,
+        window=scan_windows["ingresses"], ephe=ephe
+    )
+}, ephe=EPHE)
+
+for name, window in scan_windows.items():
+    scan_timings[name]["scanned days"] = window.scanned
+
+# read off the cached retrograde timeline, no scan needed
+station_events = upcoming_stations(dt_utc, days=transit_days, timeline=RETRO,
+                                   index=EVENT_INDEX, ephe=EPHE)
+
+with st.expander("⏱️ स्कैन समय (Scan timing)"):
+    st.dataframe(pd.DataFrame(scan_timings).T.round(1), use_container_width=True)
+
+with st.expander("🧮 Position cache"):
+    # read-only: the cache is shared by all sessions
+    st.dataframe(
+        pd.DataFrame([POSITION_CACHE.stats()]).T.rename(columns={0: "value"}),
+        use_container_width=True
+    )
+
 st.subheader("🌙 Amavasya & Purnima (Upcoming)")
 
-events = detect_amavasya_purnima(dt_utc, days=30)
+events = scan_results["lunations"]
 
 ist = pytz.timezone("Asia/Kolkata")
 
-for name, data in events.items():
-    if data["start"] and data["end"]:
-        start_ist = data["start"].astimezone(ist)
-        end_ist = data["end"].astimezone(ist)
+for e in events:
+    start_ist = e["start"].astimezone(ist)
+    end_ist = e["end"].astimezone(ist)
 
-        st.markdown(
-            f"""
-            **{name}**
-            - 🟢 Start : {start_ist.strftime('%d-%b-%Y %H:%M IST')}
-            - 🔴 End   : {end_ist.strftime('%d-%b-%Y %H:%M IST')}
-            """
-        )
-    else:
+    st.markdown(
+        f"""
+        **{e["name"]}**
+        - 🟢 Start : {start_ist.strftime('%d-%b-%Y %H:%M IST')}
+        - 🔴 End   : {end_ist.strftime('%d-%b-%Y %H:%M IST')}
+        """
+    )
+
+for name in LUNATIONS:
+    if not any(e["name"] == name for e in events):
         st.caption(f"{name} not found in the next 30 days.")
 
 st.markdown('<div class="solid-card">', unsafe_allow_html=True)
-st.markdown('<div class="solid-title">🔭 Upcoming Conjunctions & Oppositions (Next 10 Days)</div>', unsafe_allow_html=True)
+aspect_span = "per-pair horizon" if aspect_auto else f"{aspect_days} days"
+st.markdown(f'<div class="solid-title">🔭 Upcoming Aspects (Next {aspect_span})</div>', unsafe_allow_html=True)
 
-events = upcoming_aspects(
-    start_dt_utc=dt_utc,
-    days=10,
-    step_minutes=30
-)
+events = scan_results["aspects"]
 
 ist = pytz.timezone("Asia/Kolkata")
 
 if not events:
-    st.caption("No major conjunctions or oppositions in the next 10 days.")
+    st.caption(f"No selected aspects in the next {aspect_span}.")
 else:
     rows = []
 
@@ -963,77 +1060,20 @@ else:
     )
     st.markdown('</div>', unsafe_allow_html=True)
 
-NAK_SIZE = 13 + 1/3
-
-def zodiac_index(deg):
-    return int(deg // 30)
-
-def nakshatra_index(deg):
-    return int(deg // NAK_SIZE)
-
-def zodiac_name(deg):
-    return SIGNS[zodiac_index(deg)]
-
-def nakshatra_name(deg):
-    return NAKSHATRAS[nakshatra_index(deg)][0]
-
-def upcoming_sign_nakshatra_changes(start_dt_utc, days=10, step_minutes=30):
-    events = []
+with st.expander("👁️ अभी की दृष्टि (Aspects at selected time)"):
+    aspect_mode = st.radio("Mode", ["sign", "degree"], horizontal=True,
+                           help="sign: whole-sign (Vedic); degree: within each aspect's orb")
+    current = detect_aspects(pos, aspect_names, aspect_drishti, aspect_mode)
+    st.write("\n".join(f"- {a}" for a in current) if current else "—")
 
-    FAST_PLANETS = ["चन्द्र", "बुध", "शुक्र", "सूर्य"]
+st.subheader(f"🪐 Planetary Transitions (Next {transit_days} Days)")
 
-    total_steps = int((days * 24 * 60) / step_minutes)
-    prev_pos = None
-
-    for step in range(total_steps):
-        dt = start_dt_utc + datetime.timedelta(minutes=step * step_minutes)
-        pos, _, _ = get_positions(dt)
-
-        if prev_pos is None:
-            prev_pos = pos
-            continue
-
-        for planet in FAST_PLANETS:
-            prev_sign = zodiac_name(prev_pos[planet])
-            curr_sign = zodiac_name(pos[planet])
-
-            if prev_sign != curr_sign:
-                events.append({
-                    "type": "Zodiac Change",
-                    "planet": planet,
-                    "from": prev_sign,
-                    "to": curr_sign,
-                    "time": dt
-                })
-
-            prev_nak = nakshatra_name(prev_pos[planet])
-            curr_nak = nakshatra_name(pos[planet])
-
-            if prev_nak != curr_nak:
-                events.append({
-                    "type": "Nakshatra Change",
-                    "planet": planet,
-                    "from": prev_nak,
-                    "to": curr_nak,
-                    "time": dt
-                })
-
-        prev_pos = pos
-
-    return events
-
-st.subheader("🪐 Planetary Transitions (Next 10 Days)")
-
-events = upcoming_sign_nakshatra_changes(
-    start_dt_utc=dt_utc,
-    days=10,
-    step_minutes=30
-)
+events = scan_results["ingresses"]
 
 ist = pytz.timezone("Asia/Kolkata")
 
 if not events:
-    st.caption("No planetary sign or nakshatra changes in the next 10 days.")
+    st.caption(f"No planetary sign or nakshatra changes in the next {transit_days} days.")
 else:
     rows = []
 
@@ -1066,6 +1106,83 @@ else:
         hide_index=True
     )
 
+st.subheader(f"⏸️ Retrograde Stations (Next {transit_days} Days)")
+
+events = station_events
+
+if not events:
+    st.caption(f"No retrograde or direct stations in the next {transit_days} days.")
+else:
+    rows = []
+
+    for e in events:
+        t_ist = e["time"].astimezone(ist)
+        rows.append([
+            t_ist.strftime("%d-%b-%Y"),
+            t_ist.strftime("%H:%M"),
+            e["planet"],
+            e["type"]
+        ])
+
+    st.dataframe(
+        pd.DataFrame(rows, columns=["Date", "Time (IST)", "Planet", "Station"]),
+        use_container_width=True,
+        hide_index=True
+    )
+
+# ================= EVENT STREAM =================
+# Open-ended, merged feed of every event kind; each "load more" resumes
+# the streams from their cursors and computes only the next page.
+EVENT_PAGE = 20
+
+st.subheader("🔮 आगामी घटनाएँ (Event stream)")
+
+stream_start = datetime_to_jd(dt_utc)
+event_streams = {
+    "aspect": lambda c: iter_aspect_events(c, aspect_set, EPHE, EVENT_INDEX),
+    "ingress": lambda c: iter_ingresses(c, transit_planets, ephe=EPHE, index=EVENT_INDEX),
+    "lunation": lambda c: iter_lunations(c, EPHE, EVENT_INDEX),
+    "station": lambda c: iter_stations(c, ephe=EPHE, index=EVENT_INDEX)
+}
+stream_id = (stream_start, tuple(aspect_names), aspect_drishti, tuple(transit_planets))
+
+def load_more_events():
+    page, st.session_state.stream_cursors = next_events(
+        event_streams, st.session_state.stream_cursors, EVENT_PAGE
+    )
+    st.session_state.stream_events += page
+
+if st.session_state.get("stream_id") != stream_id:
+    st.session_state.stream_id = stream_id
+    st.session_state.stream_events = []
+    st.session_state.stream_cursors = {kind: stream_start for kind in event_streams}
+    load_more_events()
+
+rows = []
+for kind, e in st.session_state.stream_events:
+    t_ist = (e["time"] if "time" in e else e["end"]).astimezone(ist)
+
+    if kind == "aspect":
+        label, detail = e["aspect"], e["planets"]
+    elif kind == "ingress":
+        label = e["type"]
+        detail = f'{e["planet"]}: {ingress_cell_name(e["level"], e["from"])} → ' \
+                 f'{ingress_cell_name(e["level"], e["to"])}'
+    elif kind == "lunation":
+        label = e["name"]
+        detail = f'Start {e["start"].astimezone(ist).strftime("%d-%b %H:%M")}'
+    else:
+        label, detail = e["type"], e["planet"]
+
+    rows.append([t_ist.strftime("%d-%b-%Y"), t_ist.strftime("%H:%M"), label, detail])
+
+st.dataframe(
+    pd.DataFrame(rows, columns=["Date", "Time (IST)", "Event", "Details"]),
+    use_container_width=True,
+    hide_index=True
+)
+st.button("और दिखाएँ (Load more)", on_click=load_more_events)
+
 # ================= NORTH INDIAN KUNDALI (FINAL FIXED) =================
 
 
@@ -1217,55 +1334,20 @@ st.components.v1.html(
     height=720
 )
 
-# ================= D9 (NAVAMSHA) =================
-MOVABLE = [0,3,6,9]
-FIXED   = [1,4,7,10]
-DUAL    = [2,5,8,11]
-
-def get_d9_sign(lon):
-    rashi = int(lon // 30)
-    part  = int((lon % 30) // (30/9))
-
-    if rashi in MOVABLE:
-        return (rashi + part) % 12
-    elif rashi in FIXED:
-        return (rashi + 8 + part) % 12
-    else:  # dual
-        return (rashi + 4 + part) % 12
-
-def get_d10_sign(lon):
-    rashi = int(lon // 30)
-    part  = int((lon % 30) // 3)
-
-    if rashi % 2 == 0:
-        return (rashi + part) % 12
-    else:
-        return (rashi + 9 - part) % 12
-
-
-
-def get_d9_positions(pos):
-    return {p: get_d9_sign(lon) * 30 for p, lon in pos.items()}
-
-def generate_d9_kundali(pos, lagna_deg):
-    d9_pos = get_d9_positions(pos)
-    d9_lagna_deg = get_d9_sign(lagna_deg) * 30
-    return generate_north_indian_kundali(d9_pos, d9_lagna_deg)
+# ================= VARGAS (D1–D60) =================
+# every varga of every graha and the lagna in one pass (vargas.py)
+VARGA_MATRIX = chart_vargas(pos, lagna_deg)
 
-def get_d10_positions(pos):
-    return {p: get_d10_sign(lon) * 30 for p, lon in pos.items()}
+def generate_varga_kundali(n):
+    varga_pos, varga_lagna_deg = varga_positions(pos, lagna_deg, n, VARGA_MATRIX)
+    return generate_north_indian_kundali(varga_pos, varga_lagna_deg)
 
 
-def generate_d10_kundali(pos, lagna_deg):
-    d10_pos = get_d10_positions(pos)
-    d10_lagna_deg = get_d10_sign(lagna_deg) * 30
-    return generate_north_indian_kundali(d10_pos, d10_lagna_deg)
-
 
 
 st.subheader("🪐 D9 — नवांश कुंडली")
 st.components.v1.html(
-    generate_d9_kundali(pos, lagna_deg),
+    generate_varga_kundali(9),
     height=720
 )
 
@@ -1275,93 +1357,31 @@ st.components.v1.html(
 
 st.subheader("🪐 D10 — दशांश कुंडली (Career)")
 st.components.v1.html(
-    generate_d10_kundali(pos, lagna_deg),
+    generate_varga_kundali(10),
     height=720
 )
 
+with st.expander("📊 सभी वर्ग (D1–D60)"):
+    st.dataframe(
+        VARGA_MATRIX.apply(lambda col: col.map(SIGNS.__getitem__)),
+        use_container_width=True
+    )
 
 
-DASHA_SEQ = [
-    ("केतु",7), ("शुक्र",20), ("सूर्य",6), ("चन्द्र",10),
-    ("मंगल",7), ("राहु",18), ("बृहस्पति",16),
-    ("शनि",19), ("बुध",17)
-]
-
-DASHA_YEARS = dict(DASHA_SEQ)
-TOTAL_VIMSHOTTARI = 120.0
-SIDEREAL_YEAR = 365.25636
-
-
-
-def vimshottari_dasha(jd, moon_lon):
-    # Nakshatra calculation
-    nak_index = int(moon_lon // NAK_SIZE)
-    lord = NAKSHATRAS[nak_index][1]
 
-    # True Moon longitude + speed
+def chart_dasha_trees(jd, lagna_deg):
+    # True Moon longitude + speed, shared by every nakshatra system
     moon_lon_true, moon_speed = get_true_moon_lon_and_speed(jd)
 
-    # Exact Nakshatra start longitude
-    nak_start_lon = nak_index * NAK_SIZE
-    delta_deg = (moon_lon_true - nak_start_lon) % NAK_SIZE
-
-    # Nakshatra start JD (Drik method)
-    nak_start_jd = jd - (delta_deg / moon_speed)
-
-    start_idx = [p for p, _ in DASHA_SEQ].index(lord)
-
-    dashas = []
-    start = nak_start_jd
-
-    for i in range(9):
-        planet, years = DASHA_SEQ[(start_idx + i) % 9]
-        end = start + years * 365.25636  # sidereal year
-        dashas.append((planet, start, end))
-        start = end
-
-    return dashas
-
-def compute_sub_dasha(start_jd, main_lord, main_years, level=1, max_level=5):
-    """
-    level:
-    1 = Mahadasha
-    2 = Antardasha
-    3 = Pratyantar
-    4 = Sukshma
-    5 = Prana
-    """
+    # each tree starts where the Moon entered its first lord's nakshatra
+    # (Drik method); periods are resolved on demand (dasha.py)
+    trees = chart_dashas(jd, moon_lon_true, moon_speed)
 
-    seq = [p for p, _ in DASHA_SEQ]
-    start_idx = seq.index(main_lord)
-
-    results = []
-    curr_start = start_jd
-
-    for i in range(9):
-        lord = seq[(start_idx + i) % 9]
-        sub_years = (main_years * DASHA_YEARS[lord]) / TOTAL_VIMSHOTTARI
-        curr_end = curr_start + sub_years * SIDEREAL_YEAR
-
-        node = {
-            "level": level,
-            "lord": lord,
-            "start": curr_start,
-            "end": curr_end
-        }
-
-        if level < max_level:
-            node["children"] = compute_sub_dasha(
-                curr_start,
-                lord,
-                sub_years,
-                level + 1,
-                max_level
-            )
-
-        results.append(node)
-        curr_start = curr_end
-
-    return results
+    # Chara runs from the lagna at birth on the chart's own sign years
+    lagna_sign = int(lagna_deg // 30)
+    chara = chara_system(lagna_sign, {p: int(pos[p] // 30) for p in set(RASHI_LORDS)})
+    trees[chara.name] = chara.tree(jd, lagna_sign)
+    return trees
 
 
 
@@ -1369,63 +1389,59 @@ def compute_sub_dasha(start_jd, main_lord, main_years, level=1, max_level=5):
 
 st.subheader("⏳ विंशोत्तरी महादशा")
 
-dashas = vimshottari_dasha(jd, pos["चन्द्र"])
+DASHA_TREES = chart_dasha_trees(jd, lagna_deg)
+DASHA_TREE = DASHA_TREES[VIMSHOTTARI.name]
+dashas = DASHA_TREE.mahadashas(jd)
 rows = []
-for p, s, e in dashas:
+for md in dashas:
     rows.append([
-        p,
-        swe.revjul(s)[0:3],
-        swe.revjul(e)[0:3]
+        md.lord,
+        swe.revjul(md.start)[0:3],
+        swe.revjul(md.end)[0:3]
     ])
 
 st.table(pd.DataFrame(rows, columns=["दशा", "आरंभ", "समाप्ति"]))
 
-st.subheader("🔹 अंतरदशा (Current Mahadasha)")
-
 today_jd = jd
 
-# find running Mahadasha
-for md_lord, md_start, md_end in dashas:
-    if md_start <= today_jd < md_end:
-        current_md = (md_lord, md_start, md_end)
-        break
-
-antar_tree = compute_sub_dasha(
-    start_jd=current_md[1],
-    main_lord=current_md[0],
-    main_years=DASHA_YEARS[current_md[0]],
-    max_level=2
-)
+# running MD ... Prana by arithmetic on the tree (dasha.py); the
+# 120-year cycle repeats, so it is empty only before the tree's start
+running_chain = DASHA_TREE.running(today_jd)
 
-antar_rows = []
-for a in antar_tree:
-    antar_rows.append([
-        a["lord"],
-        swe.revjul(a["start"])[0:3],
-        swe.revjul(a["end"])[0:3]
-    ])
+if not running_chain:
+    st.info("इस समय कोई चालू दशा नहीं (विंशोत्तरी चक्र से बाहर)")
+else:
+    st.subheader("🔹 चालू दशा (महादशा → प्राण)")
+    st.table(pd.DataFrame(
+        [[level, p.lord, swe.revjul(p.start)[0:3], swe.revjul(p.end)[0:3]]
+         for level, p in zip(DASHA_LEVELS, running_chain)],
+        columns=["स्तर", "दशा", "आरंभ", "समाप्ति"]
+    ))
 
-st.table(pd.DataFrame(
-    antar_rows,
-    columns=["अंतर दशा", "आरंभ", "समाप्ति"]
-))
+    st.subheader("🔹 अंतरदशा (Current Mahadasha)")
 
+    antar_rows = []
+    for a in running_chain[0].children():
+        antar_rows.append([
+            a.lord,
+            swe.revjul(a.start)[0:3],
+            swe.revjul(a.end)[0:3]
+        ])
+
+    st.table(pd.DataFrame(
+        antar_rows,
+        columns=["अंतर दशा", "आरंभ", "समाप्ति"]
+    ))
 
-st.subheader("🔸  प्रत्यंतर दशा")
 
-running_antar = None
-for a in antar_tree:
-    if a["start"] <= today_jd < a["end"]:
-        running_antar = a
-        break
+    st.subheader("🔸  प्रत्यंतर दशा")
 
-if running_antar:
     praty_rows = []
-    for p in running_antar["children"]:
+    for p in running_chain[1].children():
         praty_rows.append([
-            p["lord"],
-            swe.revjul(p["start"])[0:3],
-            swe.revjul(p["end"])[0:3]
+            p.lord,
+            swe.revjul(p.start)[0:3],
+            swe.revjul(p.end)[0:3]
         ])
 
     st.table(pd.DataFrame(
@@ -1434,6 +1450,27 @@ if running_antar:
     ))
 
 
+st.subheader("🔹 सभी दशा पद्धतियाँ (चालू)")
+
+# Vimshottari, Ashtottari and Yogini repeat their cycle; Chara's first
+# cycle only is modelled, so past it the row says so instead of a lord
+system_rows = []
+for name, tree in DASHA_TREES.items():
+    chain = tree.running(today_jd, depth=2)
+    if chain:
+        md, ad = chain
+        system_rows.append([name, md.lord, ad.lord,
+                            swe.revjul(ad.start)[0:3], swe.revjul(ad.end)[0:3]])
+    else:
+        years = tree.system.cycle_days / SIDEREAL_YEAR
+        system_rows.append([name, f"{years:.0f} वर्ष के चक्र से बाहर", "—", "—", "—"])
+
+st.table(pd.DataFrame(
+    system_rows,
+    columns=["पद्धति", "महादशा", "अंतरदशा", "आरंभ", "समाप्ति"]
+))
+
+
 
 ASHTAKA_RULES = {
     "सूर्य": [1,2,4,7,8,9,10,11],
@@ -0,0 +1,232 @@
+import datetime
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pytz
+import swisseph as swe
+
+# ================= GRAHAS =================
+# Same order as PLANETS in VDK.py / vaidikwatch.py; केतु is always the
+# last column and is derived from राहु, never computed.
+GRAHAS = [
+    ("सूर्य", swe.SUN),
+    ("चन्द्र", swe.MOON),
+    ("मंगल", swe.MARS),
+    ("बुध", swe.MERCURY),
+    ("बृहस्पति", swe.JUPITER),
+    ("शुक्र", swe.VENUS),
+    ("शनि", swe.SATURN),
+    ("राहु", swe.MEAN_NODE)
+]
+
+GRAHA_NAMES = [name for name, _ in GRAHAS] + ["केतु"]
+GRAHA_INDEX = {name: i for i, name in enumerate(GRAHA_NAMES)}
+RAHU = GRAHA_INDEX["राहु"]
+KETU = GRAHA_INDEX["केतु"]
+
+# Upper bound of |longitude speed| in deg/day, per GRAHA_NAMES column.
+# Used to size bracketing steps so no crossing can be jumped over.
+MAX_SPEED = [1.02, 15.4, 0.8, 2.2, 0.25, 1.26, 0.14, 0.06, 0.06]
+
+# Mean sidereal motion in deg/day per GRAHA_NAMES column; बुध and शुक्र
+# keep pace with the Sun on average, so their cycles with it (and with
+# each other) are their mean synodic periods in days instead.
+MEAN_SPEED = [0.985609, 13.176358, 0.524033, 0.985609, 0.083091, 0.985609,
+              0.033460, -0.052992, -0.052992]
+SOLAR_SYNODIC = {"बुध": 115.88, "शुक्र": 583.92}
+
+# calc_ut defaults, spelled out because they are part of every cache key
+CALC_FLAGS = swe.FLG_SWIEPH | swe.FLG_SPEED
+SID_MODE = swe.SIDM_LAHIRI
+
+JD_UNIX_EPOCH = 2440587.5
+
+
+# ================= TIME CONVERSION =================
+def datetime_to_jd(dt):
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(pytz.utc)
+    return swe.julday(dt.year, dt.month, dt.day,
+                      dt.hour + dt.minute/60 + (dt.second + dt.microsecond/1e6)/3600)
+
+
+def jd_to_datetime(jd):
+    return datetime.datetime(1970, 1, 1, tzinfo=pytz.utc) + \
+        datetime.timedelta(days=float(jd) - JD_UNIX_EPOCH)
+
+
+def to_jd_array(times):
+    """
+    Accepts a scalar or array of Julian days, numpy datetime64 values
+    or (naive UTC / aware) datetimes and returns a float64 JD array.
+    """
+    arr = np.atleast_1d(np.asarray(times))
+
+    if arr.dtype.kind in "fiu":
+        return arr.astype(np.float64)
+
+    if arr.dtype.kind == "M":
+        days = (arr - np.datetime64("1970-01-01T00:00:00")) / np.timedelta64(1, "D")
+        return days.astype(np.float64) + JD_UNIX_EPOCH
+
+    return np.array([datetime_to_jd(t) for t in arr.ravel()],
+                    dtype=np.float64).reshape(arr.shape)
+
+
+# ================= BATCH POSITIONS =================
+def sidereal_ayanamsa(jd, sid_mode=SID_MODE):
+    # Swiss Ephemeris keeps the sidereal mode per thread and Streamlit
+    # reruns scripts and callbacks on fresh threads, so never rely on a
+    # set_sid_mode done elsewhere.
+    swe.set_sid_mode(sid_mode)
+    return swe.get_ayanamsa_ut(jd)
+
+
+def sidereal_houses(jd, lat, lon, hsys=b'P', sid_mode=SID_MODE):
+    """swe.houses_ex in `sid_mode`, set on the calling thread first."""
+    swe.set_sid_mode(sid_mode)
+    return swe.houses_ex(jd, lat, lon, hsys, swe.FLG_SWIEPH | swe.FLG_SIDEREAL)
+
+
+def calc_grahas(jds, cols=None, cache=None, sid_mode=SID_MODE):
+    """
+    Sidereal (Lahiri by default) longitude and longitude speed for the
+    grahas. Returns two (T x N) float arrays; column order is GRAHA_NAMES,
+    or `cols` (GRAHA_NAMES indices) when only a few bodies are needed.
+    Every Swiss Ephemeris call goes through `cache` when one is given
+    (the cache then decides the ayanamsa mode).
+    """
+    calc_ut = swe.calc_ut if cache is None else cache.calc_ut
+    if cache is None:
+        get_ayanamsa_ut = lambda jd: sidereal_ayanamsa(jd, sid_mode)
+    else:
+        get_ayanamsa_ut = cache.get_ayanamsa_ut
+
+    jds = to_jd_array(jds)
+    cols = list(range(len(GRAHA_NAMES))) if cols is None else list(cols)
+    codes = sorted({RAHU if c == KETU else c for c in cols})
+    T = len(jds)
+
+    trop = np.zeros((T, len(GRAHA_NAMES)))
+    speed = np.zeros((T, len(GRAHA_NAMES)))
+    ay = np.empty(T)
+
+    # Swiss Ephemeris has no array entry point, so the loop stays here;
+    # everything after it is vectorized.
+    for i, jd in enumerate(jds):
+        ay[i] = get_ayanamsa_ut(jd)
+        for c in codes:
+            r, _ = calc_ut(jd, GRAHAS[c][1], CALC_FLAGS)
+            trop[i, c] = r[0]
+            speed[i, c] = r[3]
+
+    lons = (trop - ay[:, None]) % 360
+    lons[:, KETU] = (lons[:, RAHU] + 180) % 360
+    speed[:, KETU] = speed[:, RAHU]
+
+    return lons[:, cols], speed[:, cols]
+
+
+def get_positions_batch(times, ephe=calc_grahas):
+    """
+    Vectorized get_positions over an array of datetimes or JDs.
+    Returns (lons, retro, jds): a (T x 9) longitude array, a matching
+    boolean retrograde mask and the JD array.
+
+    `ephe` is any calc_grahas-compatible backend, e.g. a
+    ChebyshevEphemeris from ephemeris_grid.py.
+    """
+    jds = to_jd_array(times)
+    lons, speed = ephe(jds)
+    return lons, speed < 0, jds
+
+
+def get_positions(dt_utc, ephe=calc_grahas):
+    jd = swe.julday(dt_utc.year, dt_utc.month, dt_utc.day,
+                    dt_utc.hour + dt_utc.minute/60)
+
+    lons, retro, _ = get_positions_batch(jd, ephe)
+
+    pos = dict(zip(GRAHA_NAMES, lons[0].tolist()))
+    retro = dict(zip(GRAHA_NAMES, retro[0].tolist()))
+
+    return pos, retro, jd
+
+
+# ================= POSITION CACHE =================
+class PositionCache:
+    """
+    Bounded LRU cache in front of swe.calc_ut / swe.get_ayanamsa_ut, keyed
+    by (quantized JD, body, flags, ayanamsa mode).
+
+    Values are computed at the quantized instant, so a result never
+    depends on which caller filled the entry. Root refinement converges
+    to about the quantum, so keep it near XTOL (~1 s) for event scans.
+    """
+
+    def __init__(self, maxsize=200_000, quantum_seconds=1.0, sid_mode=SID_MODE):
+        self.maxsize = maxsize
+        self.quantum_seconds = quantum_seconds
+        self.sid_mode = sid_mode
+        self.entries = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+        self.lock = threading.Lock()
+
+    def set_quantum(self, seconds):
+        with self.lock:
+            self.quantum_seconds = seconds
+            self.entries.clear()
+
+    def quantize(self, jd):
+        q = self.quantum_seconds / 86400
+        n = round(float(jd) / q)
+        return n, n * q
+
+    def lookup(self, key, compute):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self.lock:
+            self.entries[key] = value
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+        return value
+
+    def calc_ut(self, jd, code, flags=CALC_FLAGS):
+        n, qjd = self.quantize(jd)
+
+        def compute():
+            if flags & swe.FLG_SIDEREAL:
+                swe.set_sid_mode(self.sid_mode)
+            return swe.calc_ut(qjd, code, flags)
+
+        return self.lookup((n, code, flags, self.sid_mode), compute)
+
+    def get_ayanamsa_ut(self, jd):
+        n, qjd = self.quantize(jd)
+        return self.lookup((n, "ay", self.sid_mode),
+                           lambda: sidereal_ayanamsa(qjd, self.sid_mode))
+
+    def calc_grahas(self, jds, cols=None):
+        return calc_grahas(jds, cols, cache=self)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "quantum (s)": self.quantum_seconds
+        }
@@ -0,0 +1,229 @@
+"""
+Precomputed Chebyshev ephemeris for the nine grahas and Lahiri ayanamsa.
+
+Build once (defaults to the ±500 year range of the date picker):
+
+    python ephemeris_grid.py --start-year 1526 --end-year 2526
+
+then pass a ChebyshevEphemeris wherever calc_grahas is accepted
+(get_positions, get_positions_batch, scan_all and every events.* engine).
+"""
+import argparse
+import datetime
+import math
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import swisseph as swe
+from numpy.polynomial import chebyshev as cheb
+
+from ephemeris import GRAHAS, GRAHA_NAMES, RAHU, KETU, calc_grahas, to_jd_array
+
+GRID_PATH = "ephemeris_grid.npz"
+
+# GRAHAS column (or "ay") -> (segment length in days, polynomial degree).
+# Measured by accuracy_report over ±500 years: rms error under 0.03" for
+# every graha; max under 0.03" for Sun, Moon and the nodes, but up to
+# ~2.5" for the planets (बृहस्पति worst, then बुध / शुक्र / शनि). The max
+# comes from the few segments holding a kink in calc_ut's own (Moshier)
+# output, which no smooth fit follows; shorter segments only move it.
+GRID_SEGMENTS = {
+    0: (16, 12),    # सूर्य
+    1: (8, 14),     # चन्द्र
+    2: (16, 12),    # मंगल
+    3: (8, 14),     # बुध
+    4: (16, 12),    # बृहस्पति
+    5: (16, 12),    # शुक्र
+    6: (16, 12),    # शनि
+    7: (32, 12),    # राहु (mean node)
+    "ay": (365, 6)  # Lahiri ayanamsa
+}
+
+
+# ================= BUILD =================
+def tropical_values(key, jds):
+    out = np.empty(jds.size)
+    for i, jd in enumerate(jds.ravel()):
+        if key == "ay":
+            out[i] = swe.get_ayanamsa_ut(jd)
+        else:
+            r, _ = swe.calc_ut(jd, GRAHAS[key][1])
+            out[i] = r[0]
+    return out.reshape(jds.shape)
+
+
+def fit_body(key, jd_start, jd_end):
+    seg, deg = GRID_SEGMENTS[key]
+    nseg = int(math.ceil((jd_end - jd_start) / seg))
+
+    nodes = np.cos(np.pi * (np.arange(deg + 1) + 0.5) / (deg + 1))
+    jds = jd_start + (np.arange(nseg)[:, None] + (nodes[None, :] + 1) / 2) * seg
+
+    vals = np.unwrap(tropical_values(key, jds), period=360, axis=1)
+    coef = vals @ np.linalg.inv(cheb.chebvander(nodes, deg)).T
+
+    # c0 carries the full longitude, the rest are small enough for float32
+    return coef[:, 0], coef[:, 1:].astype(np.float32)
+
+
+def build_grid(jd_start, jd_end, path=GRID_PATH, verbose=True):
+    swe.set_sid_mode(swe.SIDM_LAHIRI)
+    arrays = {"span": np.array([jd_start, jd_end])}
+
+    for key in GRID_SEGMENTS:
+        t0 = time.perf_counter()
+        arrays[f"c0_{key}"], arrays[f"ck_{key}"] = fit_body(key, jd_start, jd_end)
+        if verbose:
+            name = "ayanamsa" if key == "ay" else GRAHA_NAMES[key]
+            print(f"{name}: {len(arrays[f'c0_{key}'])} segments "
+                  f"in {time.perf_counter() - t0:.1f}s")
+
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+
+# ================= READER =================
+def clenshaw(x, c):
+    b1 = b2 = 0.0
+    for ck in reversed(c[1:]):
+        b1, b2 = 2 * x * b1 - b2 + ck, b1
+    return x * b1 - b2 + c[0]
+
+
+class ChebyshevEphemeris:
+    """
+    Vectorized sidereal longitude / speed from a build_grid file.
+    Signature-compatible with calc_grahas; JDs outside the fitted span
+    go to `fallback` (Swiss Ephemeris by default).
+    """
+
+    def __init__(self, path=GRID_PATH, fallback=calc_grahas):
+        data = np.load(path)
+        self.fallback = fallback
+        self.jd_start, self.jd_end = data["span"].tolist()
+
+        # expanded to float64 value and derivative coefficients once, so
+        # evaluation is a gather plus Clenshaw recurrence
+        self.bodies = {}
+        for key, (seg, _) in GRID_SEGMENTS.items():
+            coef = np.hstack([data[f"c0_{key}"][:, None],
+                              data[f"ck_{key}"].astype(np.float64)])
+            der = cheb.chebder(coef, axis=1) * (2 / seg)
+            self.bodies[key] = (seg, coef, der)
+
+    def covers(self, jds):
+        jds = to_jd_array(jds)
+        return (jds >= self.jd_start) & (jds < self.jd_end)
+
+    def eval_body(self, key, jds):
+        seg, coef, der = self.bodies[key]
+        u = (jds - self.jd_start) / seg
+        idx = np.clip(np.floor(u).astype(np.int64), 0, len(coef) - 1)
+        x = 2 * (u - idx) - 1
+
+        if len(jds) == 1:
+            # root refinement asks for one instant at a time
+            i, x = int(idx[0]), float(x[0])
+            return (np.array([clenshaw(x, coef[i].tolist())]),
+                    np.array([clenshaw(x, der[i].tolist())]))
+
+        return (cheb.chebval(x, coef[idx].T, tensor=False),
+                cheb.chebval(x, der[idx].T, tensor=False))
+
+    def __call__(self, jds, cols=None):
+        jds = to_jd_array(jds)
+        cols = list(range(len(GRAHA_NAMES))) if cols is None else list(cols)
+
+        inside = self.covers(jds)
+        if not inside.all():
+            lons = np.empty((len(jds), len(cols)))
+            speed = np.empty((len(jds), len(cols)))
+            lons[~inside], speed[~inside] = self.fallback(jds[~inside], cols)
+            if inside.any():
+                lons[inside], speed[inside] = self(jds[inside], cols)
+            return lons, speed
+
+        codes = sorted({RAHU if c == KETU else c for c in cols})
+        ay, _ = self.eval_body("ay", jds)
+
+        lons = np.zeros((len(jds), len(GRAHA_NAMES)))
+        speed = np.zeros((len(jds), len(GRAHA_NAMES)))
+        for c in codes:
+            val, der = self.eval_body(c, jds)
+            lons[:, c] = (val - ay) % 360
+            speed[:, c] = der
+
+        lons[:, KETU] = (lons[:, RAHU] + 180) % 360
+        speed[:, KETU] = speed[:, RAHU]
+
+        return lons[:, cols], speed[:, cols]
+
+
+def load_grid(path=GRID_PATH, fallback=calc_grahas):
+    # `fallback` itself when no grid has been built
+    if os.path.exists(path):
+        return ChebyshevEphemeris(path, fallback)
+    return fallback
+
+
+# ================= REPORTS =================
+def accuracy_report(grid, n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    jds = rng.uniform(grid.jd_start, grid.jd_end, n)
+
+    gl, gs = grid(jds)
+    sl, ss = calc_grahas(jds)
+
+    dl = np.abs((gl - sl + 180) % 360 - 180) * 3600
+    ds = np.abs(gs - ss) * 3600
+
+    return pd.DataFrame({
+        "graha": GRAHA_NAMES,
+        "max lon err (\")": dl.max(axis=0),
+        "rms lon err (\")": np.sqrt((dl ** 2).mean(axis=0)),
+        "max speed err (\"/day)": ds.max(axis=0)
+    })
+
+
+def benchmark(grid, n=200_000, n_swe=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    jds = rng.uniform(grid.jd_start, grid.jd_end, n)
+
+    t0 = time.perf_counter()
+    grid(jds)
+    t_grid = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    calc_grahas(jds[:n_swe])
+    t_swe = time.perf_counter() - t0
+
+    return {
+        "grid samples/s": n / t_grid,
+        "swe samples/s": n_swe / t_swe,
+        "speed-up": (n / t_grid) / (n_swe / t_swe)
+    }
+
+
+if __name__ == "__main__":
+    year = datetime.date.today().year
+
+    parser = argparse.ArgumentParser(description="Build the Chebyshev ephemeris grid")
+    parser.add_argument("--start-year", type=int, default=year - 500)
+    parser.add_argument("--end-year", type=int, default=year + 500)
+    parser.add_argument("--out", default=GRID_PATH)
+    parser.add_argument("--report-only", action="store_true")
+    args = parser.parse_args()
+
+    swe.set_sid_mode(swe.SIDM_LAHIRI)
+
+    if not args.report_only:
+        build_grid(swe.julday(args.start_year, 1, 1, 0),
+                   swe.julday(args.end_year, 1, 1, 0), args.out)
+        print(f"wrote {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB)")
+
+    grid = ChebyshevEphemeris(args.out)
+    print(accuracy_report(grid).round(4).to_string(index=False))
+    for k, v in benchmark(grid).items():
+        print(f"{k}: {v:,.0f}")
@@ -0,0 +1,170 @@
+"""
+A single thread that runs the apps' live Swiss Ephemeris requests.
+
+Streamlit runs every session, rerun and callback on its own thread in
+one process. EphemerisService queues their position requests and other
+swisseph calls to one worker thread, and requests queued while the
+worker is busy are taken together: position requests for the same
+columns are evaluated as one array, so concurrent sessions share
+throughput instead of each making its own calls.
+
+swisseph keeps the sidereal mode and ephemeris path per thread, so a
+fresh thread starts in the default (Fagan/Bradley) mode with the default
+path. The worker sets the service's mode and path on its own thread
+once, and the sidereal helpers (calc_grahas, PositionCache,
+sidereal_houses) set the mode again on whatever thread calls them; the
+apps send every live swisseph call through the service so all of them
+also see its ephemeris path. Two services with different ayanamsas
+never see each other's settings. For isolation across CPUs use
+parallel.make_pool, whose workers are configured the same way.
+"""
+import asyncio
+import functools
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import swisseph as swe
+
+from ephemeris import SID_MODE, calc_grahas, to_jd_array
+
+# Requests taken off the queue per worker wake-up
+MAX_BATCH = 256
+
+
+class EphemerisService:
+    """
+    calc_grahas-compatible backend whose requests run on one worker
+    thread. `sid_mode` and `ephe_path` (when given) are set on that
+    thread when it starts; they don't reach any other thread.
+
+    `source` is what the worker evaluates for position requests
+    (calc_grahas in `sid_mode` by default, or e.g. a PositionCache's
+    calc_grahas); call() runs any other swisseph function (sidereal_houses,
+    rise_trans, ...) on the same thread.
+    """
+
+    def __init__(self, sid_mode=SID_MODE, ephe_path=None, source=None,
+                 max_batch=MAX_BATCH):
+        self.sid_mode = sid_mode
+        self.ephe_path = ephe_path
+        self.source = functools.partial(calc_grahas, sid_mode=sid_mode) \
+            if source is None else source
+        self.max_batch = max_batch
+        self.requests = self.batches = 0
+
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True,
+                                       name="ephemeris-service")
+        self.thread.start()
+
+    # ---------- worker ----------
+    def run(self):
+        if self.ephe_path is not None:
+            swe.set_ephe_path(self.ephe_path)
+        swe.set_sid_mode(self.sid_mode)
+
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            batch = [job]
+            while len(batch) < self.max_batch:
+                try:
+                    job = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    self.queue.put(None)
+                    break
+                batch.append(job)
+            self.execute(batch)
+
+    def execute(self, batch):
+        self.batches += 1
+        self.requests += len(batch)
+
+        # position requests grouped by columns and stacked into one call
+        groups = {}
+        for job in batch:
+            if job[0] == "calc":
+                groups.setdefault(job[2], []).append(job)
+            else:
+                _, func, args, kwargs, future = job
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(func(*args, **kwargs))
+                    except Exception as exc:
+                        future.set_exception(exc)
+
+        for cols, jobs in groups.items():
+            jobs = [job for job in jobs if job[3].set_running_or_notify_cancel()]
+            if not jobs:
+                continue
+            try:
+                lons, speed = self.source(np.concatenate([job[1] for job in jobs]),
+                                          None if cols is None else list(cols))
+            except Exception as exc:
+                for job in jobs:
+                    job[3].set_exception(exc)
+                continue
+
+            a = 0
+            for _, jds, _, future in jobs:
+                b = a + len(jds)
+                future.set_result((lons[a:b], speed[a:b]))
+                a = b
+
+    def on_worker(self):
+        return threading.current_thread() is self.thread
+
+    # ---------- requests ----------
+    def submit(self, jds, cols=None):
+        """Future of (lons, speeds), as calc_grahas(jds, cols)."""
+        future = Future()
+        cols = None if cols is None else tuple(cols)
+        self.queue.put(("calc", to_jd_array(jds), cols, future))
+        return future
+
+    def submit_call(self, func, *args, **kwargs):
+        future = Future()
+        self.queue.put(("call", func, args, kwargs, future))
+        return future
+
+    def __call__(self, jds, cols=None):
+        if self.on_worker():
+            # a source that calls back into the service must not wait on itself
+            return self.source(to_jd_array(jds), cols)
+        return self.submit(jds, cols).result()
+
+    def call(self, func, *args, **kwargs):
+        if self.on_worker():
+            return func(*args, **kwargs)
+        return self.submit_call(func, *args, **kwargs).result()
+
+    def calc_many(self, requests):
+        """
+        [(jds, cols), ...] -> [(lons, speeds), ...]; everything is queued
+        before waiting, so the worker evaluates the lot in one batch.
+        """
+        futures = [self.submit(jds, cols) for jds, cols in requests]
+        return [f.result() for f in futures]
+
+    async def calc_async(self, jds, cols=None):
+        return await asyncio.wrap_future(self.submit(jds, cols))
+
+    async def call_async(self, func, *args, **kwargs):
+        return await asyncio.wrap_future(self.submit_call(func, *args, **kwargs))
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "requests / batch": self.requests / self.batches if self.batches else 0.0,
+            "queued": self.queue.qsize()
+        }
@@ -0,0 +1,148 @@
+"""
+Memory-mapped table of precomputed sidereal positions.
+
+    python ephemeris_store.py --start-year 1900 --end-year 2100 --step-hours 1
+
+writes ephemeris_store.npy (rows of [longitude, speed] x 9 grahas at a fixed
+JD step) plus a small JSON sidecar. Every Streamlit worker maps the same file
+read-only, so the OS page cache holds one copy for all processes.
+"""
+import argparse
+import json
+import math
+import os
+
+import numpy as np
+import swisseph as swe
+
+from ephemeris import GRAHA_NAMES, calc_grahas, to_jd_array
+from ephemeris_grid import load_grid
+
+STORE_PATH = "ephemeris_store.npy"
+
+# Stored speeds are tropical (as from calc_ut) while longitudes are
+# sidereal; they differ by the precession rate, which Hermite needs
+# removed to stay consistent (deg/day).
+PRECESSION_RATE = 50.29 / 3600 / 365.25
+
+
+def meta_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+# ================= BUILD =================
+def build_store(jd_start, jd_end, step_hours=1.0, path=STORE_PATH, source=None,
+                chunk=100_000, verbose=True):
+    source = load_grid() if source is None else source
+    step = step_hours / 24
+    n = int(math.floor((jd_end - jd_start) / step)) + 1
+
+    table = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.float64, shape=(n, 2, len(GRAHA_NAMES))
+    )
+
+    for a in range(0, n, chunk):
+        jds = jd_start + np.arange(a, min(n, a + chunk)) * step
+        lons, speed = source(jds)
+        table[a:a + len(jds), 0] = lons
+        table[a:a + len(jds), 1] = speed
+        if verbose:
+            print(f"{a + len(jds):,} / {n:,} rows")
+
+    table.flush()
+    del table
+
+    with open(meta_path(path), "w") as f:
+        json.dump({"jd_start": jd_start, "step": step, "rows": n}, f)
+
+
+# ================= READER =================
+class MemmapEphemeris:
+    """
+    calc_grahas-compatible reader over a build_store file. JDs between two
+    rows are cubic-Hermite interpolated from the stored longitude and
+    speed; JDs outside the table go to `fallback`.
+    """
+
+    def __init__(self, path=STORE_PATH, fallback=calc_grahas):
+        with open(meta_path(path)) as f:
+            meta = json.load(f)
+
+        self.table = np.load(path, mmap_mode="r")
+        self.jd_start = meta["jd_start"]
+        self.step = meta["step"]
+        self.jd_end = self.jd_start + (len(self.table) - 1) * self.step
+        self.fallback = fallback
+
+    def covers(self, jds):
+        jds = to_jd_array(jds)
+        return (jds >= self.jd_start) & (jds <= self.jd_end)
+
+    def index(self, jd):
+        return int(round((jd - self.jd_start) / self.step))
+
+    def rows(self, jd_start, jd_end):
+        """
+        Zero-copy (jds, lons, speeds) views of every stored row in
+        [jd_start, jd_end], clipped to the table.
+        """
+        i0 = max(int(math.ceil((jd_start - self.jd_start) / self.step)), 0)
+        i1 = min(int(math.floor((jd_end - self.jd_start) / self.step)) + 1,
+                 len(self.table))
+        block = self.table[i0:i1]
+        jds = self.jd_start + np.arange(i0, i1) * self.step
+        return jds, block[:, 0], block[:, 1]
+
+    def __call__(self, jds, cols=None):
+        jds = to_jd_array(jds)
+        cols = list(range(len(GRAHA_NAMES))) if cols is None else list(cols)
+
+        inside = self.covers(jds)
+        if not inside.all():
+            lons = np.empty((len(jds), len(cols)))
+            speed = np.empty((len(jds), len(cols)))
+            lons[~inside], speed[~inside] = self.fallback(jds[~inside], cols)
+            if inside.any():
+                lons[inside], speed[inside] = self(jds[inside], cols)
+            return lons, speed
+
+        u = (jds - self.jd_start) / self.step
+        i = np.clip(np.floor(u).astype(np.int64), 0, len(self.table) - 2)
+        s = (u - i)[:, None]
+        h = self.step
+
+        r0 = self.table[i][:, :, cols]
+        r1 = self.table[i + 1][:, :, cols]
+        l0 = r0[:, 0]
+        v0 = r0[:, 1] - PRECESSION_RATE
+        v1 = r1[:, 1] - PRECESSION_RATE
+        d = (r1[:, 0] - l0 + 180) % 360 - 180
+
+        s2, s3 = s * s, s * s * s
+        lons = l0 + (s3 - 2*s2 + s) * h * v0 + (3*s2 - 2*s3) * d + (s3 - s2) * h * v1
+        speed = ((3*s2 - 4*s + 1) * h * v0 + (6*s - 6*s2) * d + (3*s2 - 2*s) * h * v1) / h
+
+        return lons % 360, speed + PRECESSION_RATE
+
+
+def load_store(path=STORE_PATH, fallback=None):
+    # falls back to the Chebyshev grid / calc_grahas when no store is built
+    fallback = load_grid() if fallback is None else fallback
+    if os.path.exists(path) and os.path.exists(meta_path(path)):
+        return MemmapEphemeris(path, fallback)
+    return fallback
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the memory-mapped ephemeris store")
+    parser.add_argument("--start-year", type=int, default=1900)
+    parser.add_argument("--end-year", type=int, default=2100)
+    parser.add_argument("--step-hours", type=float, default=1.0)
+    parser.add_argument("--out", default=STORE_PATH)
+    args = parser.parse_args()
+
+    swe.set_sid_mode(swe.SIDM_LAHIRI)
+    build_store(swe.julday(args.start_year, 1, 1, 0),
+                swe.julday(args.end_year, 1, 1, 0),
+                args.step_hours, args.out)
+    print(f"wrote {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB)")
@@ -0,0 +1,206 @@
+"""
+Precomputed table of every time-window event.
+
+    python event_index.py --start-year 1900 --end-year 2100
+
+writes events.parquet (one row per ingress at every level, aspect of the
+full ASPECTS set plus special drishti, lunation and station) and a small
+JSON sidecar with the span. Events do not depend on the user or location,
+so the apps answer "events between t1 and t2" with a binary search on the
+sorted JD column instead of rescanning on every rerun.
+"""
+import argparse
+import json
+import math
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import swisseph as swe
+
+from ephemeris import GRAHA_NAMES, jd_to_datetime
+from ephemeris_store import load_store
+from parallel import parallel_chunks
+from events import (
+    ASPECTS, INGRESS_LEVELS, INGRESS_TYPES,
+    aspect_table, pair_schedule,
+    find_aspect_events, find_ingresses, find_lunations, find_stations
+)
+
+INDEX_PATH = "events.parquet"
+
+# Scanned one chunk at a time so progress shows and memory stays flat
+CHUNK_DAYS = 3652.5
+
+
+def meta_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+# ================= BUILD =================
+def event_rows(jd_start, jd_end, ephe):
+    rows = []
+
+    for e in find_aspect_events(jd_start, jd_end, aspect_table(tuple(ASPECTS), drishti=True),
+                                ephe):
+        rows.append({"kind": "aspect", "jd": e["jd"], "name": e["aspect"],
+                     "planet": e["pair"][0], "planet2": e["pair"][1],
+                     "label": e["planets"]})
+
+    for e in find_ingresses(jd_start, jd_end, levels=tuple(INGRESS_LEVELS), ephe=ephe):
+        rows.append({"kind": "ingress", "jd": e["jd"], "name": e["type"],
+                     "level": e["level"], "planet": e["planet"],
+                     "cell_from": e["from"], "cell_to": e["to"], "retro": e["retro"]})
+
+    for e in find_lunations(jd_start, jd_end, ephe):
+        rows.append({"kind": "lunation", "jd": e["end_jd"], "name": e["name"],
+                     "start_jd": e["start_jd"]})
+
+    for e in find_stations(jd_start, jd_end, ephe=ephe):
+        rows.append({"kind": "station", "jd": e["jd"], "name": e["type"],
+                     "planet": e["planet"], "retro": e["retro"]})
+
+    # an event exactly on the chunk edge belongs to the next chunk
+    return [r for r in rows if r["jd"] < jd_end]
+
+
+def build_index(jd_start, jd_end, path=INDEX_PATH, ephe=None, workers=None, verbose=True):
+    # workers > 1 scans the chunks on a process pool (each worker opens
+    # its own store), otherwise one at a time with `ephe`
+    ephe = load_store() if ephe is None else ephe
+    n = int(math.ceil((jd_end - jd_start) / CHUNK_DAYS))
+
+    rows = []
+    if workers and workers > 1:
+        t0 = time.perf_counter()
+        for part in parallel_chunks(event_rows, jd_start, jd_end, workers, CHUNK_DAYS):
+            rows += part
+        if verbose:
+            print(f"{n} chunks on {workers} workers: {len(rows):,} events "
+                  f"({time.perf_counter() - t0:.1f}s)")
+    else:
+        for k in range(n):
+            t0 = time.perf_counter()
+            a = jd_start + k * CHUNK_DAYS
+            b = min(a + CHUNK_DAYS, jd_end)
+            rows += event_rows(a, b, ephe)
+            if verbose:
+                print(f"chunk {k + 1}/{n}: {len(rows):,} events "
+                      f"({time.perf_counter() - t0:.1f}s)")
+
+    df = pd.DataFrame(rows).sort_values("jd", kind="stable").reset_index(drop=True)
+    df["cell_from"] = df["cell_from"].fillna(-1).astype(np.int16)
+    df["cell_to"] = df["cell_to"].fillna(-1).astype(np.int16)
+    df["retro"] = df["retro"].fillna(False).astype(bool)
+    for col in ("kind", "name", "level", "planet", "planet2"):
+        df[col] = df[col].astype("category")
+
+    df.to_parquet(path, index=False)
+    with open(meta_path(path), "w") as f:
+        json.dump({"jd_start": jd_start, "jd_end": jd_end, "rows": len(df)}, f)
+
+
+# ================= READER =================
+class EventIndex:
+    """
+    Sorted per-kind views of a build_index file. Each query is a
+    searchsorted on that kind's JD column; rows come back in the same
+    dict shape as the live events.* detectors.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        with open(meta_path(path)) as f:
+            meta = json.load(f)
+        self.jd_start, self.jd_end = meta["jd_start"], meta["jd_end"]
+
+        df = pd.read_parquet(path)
+        self.frames = {}
+        self.jds = {}
+        for kind, part in df.groupby("kind", observed=True):
+            part = part.sort_values("jd", kind="stable").reset_index(drop=True)
+            self.frames[kind] = part
+            self.jds[kind] = part["jd"].to_numpy()
+
+    def covers(self, jd_start, jd_end):
+        return self.jd_start <= jd_start and jd_end <= self.jd_end
+
+    def between(self, kind, jd_start, jd_end):
+        a, b = np.searchsorted(self.jds[kind], [jd_start, jd_end])
+        return self.frames[kind].iloc[a:b]
+
+    def aspects(self, jd_start, jd_end, table=None, cycles=None):
+        table = aspect_table() if table is None else table
+        _, _, end = pair_schedule(table, jd_start, jd_end, cycles)
+
+        # (aspect, p1, p2) -> that row's horizon end
+        horizon = {}
+        for name, i, j, e in zip(table["name"], table["i"], table["j"], end):
+            key = (name, GRAHA_NAMES[i], GRAHA_NAMES[j])
+            horizon[key] = max(horizon.get(key, -np.inf), e)
+
+        events = []
+        for r in self.between("aspect", jd_start, jd_end).itertuples(index=False):
+            if r.jd <= horizon.get((r.name, r.planet, r.planet2), -np.inf):
+                events.append({
+                    "aspect": r.name,
+                    "planets": r.label,
+                    "pair": (r.planet, r.planet2),
+                    "jd": r.jd,
+                    "time": jd_to_datetime(r.jd)
+                })
+        return events
+
+    def ingresses(self, jd_start, jd_end, planets=None, levels=("sign", "nakshatra")):
+        planets = GRAHA_NAMES if planets is None else planets
+        rows = self.between("ingress", jd_start, jd_end)
+        rows = rows[rows["planet"].isin(planets) & rows["level"].isin(levels)]
+        return [{
+            "type": INGRESS_TYPES[r.level],
+            "level": r.level,
+            "planet": r.planet,
+            "from": int(r.cell_from),
+            "to": int(r.cell_to),
+            "retro": bool(r.retro),
+            "jd": r.jd,
+            "time": jd_to_datetime(r.jd)
+        } for r in rows.itertuples(index=False)]
+
+    def lunations(self, jd_start, jd_end):
+        return [{
+            "name": r.name,
+            "start_jd": r.start_jd,
+            "end_jd": r.jd,
+            "start": jd_to_datetime(r.start_jd),
+            "end": jd_to_datetime(r.jd)
+        } for r in self.between("lunation", jd_start, jd_end).itertuples(index=False)]
+
+    def stations(self, jd_start, jd_end):
+        return [{
+            "type": r.name,
+            "planet": r.planet,
+            "retro": bool(r.retro),
+            "jd": r.jd,
+            "time": jd_to_datetime(r.jd)
+        } for r in self.between("station", jd_start, jd_end).itertuples(index=False)]
+
+
+def load_index(path=INDEX_PATH):
+    # None when no index has been built; callers then scan live
+    if os.path.exists(path) and os.path.exists(meta_path(path)):
+        return EventIndex(path)
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the precomputed event index")
+    parser.add_argument("--start-year", type=int, default=1900)
+    parser.add_argument("--end-year", type=int, default=2100)
+    parser.add_argument("--out", default=INDEX_PATH)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    swe.set_sid_mode(swe.SIDM_LAHIRI)
+    build_index(swe.julday(args.start_year, 1, 1, 0),
+                swe.julday(args.end_year, 1, 1, 0), args.out, workers=args.workers)
+    print(f"wrote {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB)")
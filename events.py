@@ -0,0 +1,1034 @@
+import argparse
+import heapq
+import math
+import time
+from itertools import islice
+
+import numpy as np
+
+from ephemeris import (
+    GRAHA_NAMES, MAX_SPEED, MEAN_SPEED, RAHU, KETU, SOLAR_SYNODIC,
+    calc_grahas, jd_to_datetime, to_jd_array
+)
+
+# ================= CONFIG =================
+# name -> (angle, orb in degrees, symbol)
+ASPECTS = {
+    "Conjunction": (0.0, 8.0, "☌"),
+    "Opposition": (180.0, 8.0, "☍"),
+    "Trine": (120.0, 6.0, "△"),
+    "Square": (90.0, 6.0, "□"),
+    "Sextile": (60.0, 4.0, "⚹")
+}
+DEFAULT_ASPECTS = ("Conjunction", "Opposition")
+
+# Vedic special drishti: houses counted from the graha (itself = 1st),
+# on top of the 7th-house aspect every graha casts (= Opposition)
+SPECIAL_DRISHTI = {
+    "मंगल": (4, 8),
+    "बृहस्पति": (5, 9),
+    "शनि": (3, 10)
+}
+DRISHTI_ORB = 6.0
+DRISHTI_SYMBOL = "→"
+ORDINAL = {3: "rd", 4: "th", 5: "th", 8: "th", 9: "th", 10: "th"}
+
+# Largest relative motion (deg) allowed between two bracketing samples.
+# Far below 180°, so a real crossing can never be confused with the
+# ±180° wrap of the separation.
+BRACKET_DEG = 20.0
+
+# Default per-pair horizon for open-ended aspect scans, in full
+# synodic cycles (see pair_cycle)
+HORIZON_CYCLES = 1.0
+# Retrograde loops stretch the gap between two events of one aspect past
+# the pair's mean cycle: up to 1.23x (मंगल–शुक्र) over 1900-2100, so
+# a cycle is taken as the mean one times this
+CYCLE_SLACK = 1.3
+
+# Widest separation (deg) of the pairs bound to the Sun; aspects past it
+# never happen (see horizon_check)
+MAX_SEPARATION = {
+    ("सूर्य", "बुध"): 28.5,
+    ("सूर्य", "शुक्र"): 47.5,
+    ("बुध", "शुक्र"): 76.0
+}
+
+# Root tolerance in days (~1 second)
+XTOL = 1e-5
+
+SIGN_SIZE = 30.0
+
+
+# ================= ROOT FINDING =================
+def wrap180(x):
+    return (x + 180) % 360 - 180
+
+
+def crossing_indices(f):
+    """
+    Indices k where f changes side of zero between samples k and k+1,
+    ignoring the ±180° wrap of an angular quantity.
+    """
+    f = np.asarray(f)
+    side = f < 0
+    jump = np.abs(np.diff(f)) < 180
+    return np.nonzero((side[:-1] != side[1:]) & jump)[0]
+
+
+def brent(f, a, b, fa=None, fb=None, xtol=XTOL, maxiter=60):
+    """
+    Brent's method for a root of f bracketed by [a, b].
+    """
+    fa = f(a) if fa is None else fa
+    fb = f(b) if fb is None else fb
+
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+
+    c, fc = a, fa
+    d = e = b - a
+
+    for _ in range(maxiter):
+        if fb * fc > 0:
+            c, fc = a, fa
+            d = e = b - a
+
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+
+        tol = 2e-16 * abs(b) + xtol / 2
+        m = (c - b) / 2
+
+        if abs(m) <= tol or fb == 0:
+            return b
+
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                p, q = 2 * m * s, 1 - s
+            else:
+                q, r = fa / fc, fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+
+            if p > 0:
+                q = -q
+            p = abs(p)
+
+            if 2 * p < min(3 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+
+        a, fa = b, fb
+        b += d if abs(d) > tol else math.copysign(tol, m)
+        fb = f(b)
+
+    return b
+
+
+# ================= ASPECTS =================
+def aspect_pairs():
+    # राहु–केतु are always 180° apart, so that pair never produces an event
+    n = len(GRAHA_NAMES)
+    return [(i, j) for i in range(n) for j in range(i + 1, n)
+            if (i, j) != (RAHU, KETU)]
+
+
+def aspect_table(names=DEFAULT_ASPECTS, drishti=False, grahas=None):
+    """
+    Flattens the chosen aspects into parallel arrays, one row per
+    (from, to, offset) target, so every aspect of every pair is checked
+    by the same vectorized expression. An aspect holds when
+    lon[to] - lon[from] == offset (mod 360).
+
+    Symmetric aspects get both the +angle and -angle rows; Vedic special
+    drishti rows are one-way, from the graha that casts them.
+    """
+    bodies = range(len(GRAHA_NAMES)) if grahas is None else \
+        [GRAHA_NAMES.index(g) for g in grahas]
+    pairs = [(i, j) for i, j in aspect_pairs() if i in bodies and j in bodies]
+
+    rows = []
+    for name in names:
+        angle, orb, symbol = ASPECTS[name]
+        for i, j in pairs:
+            for offset in sorted({angle % 360, -angle % 360}):
+                rows.append((name, symbol, i, j, offset, orb))
+
+    if drishti:
+        for g, houses in SPECIAL_DRISHTI.items():
+            i = GRAHA_NAMES.index(g)
+            if i not in bodies:
+                continue
+            for house in houses:
+                for j in bodies:
+                    if j != i:
+                        rows.append((f"{house}{ORDINAL[house]} Drishti", DRISHTI_SYMBOL, i, j,
+                                     (house - 1) * 30.0, DRISHTI_ORB))
+
+    name, symbol, i, j, offset, orb = zip(*rows) if rows else ([],) * 6
+    return {
+        "name": np.array(name, dtype=object),
+        "symbol": np.array(symbol, dtype=object),
+        "i": np.array(i, dtype=np.int64),
+        "j": np.array(j, dtype=np.int64),
+        "offset": np.array(offset, dtype=np.float64),
+        "orb": np.array(orb, dtype=np.float64)
+    }
+
+
+def separation_matrix(lons):
+    """
+    (T x N x N) signed separation lon[j] - lon[i] in (-180, 180]
+    for a (T x N) longitude array.
+    """
+    return wrap180(lons[:, None, :] - lons[:, :, None])
+
+
+def aspect_kernel(lons, table, mode="degree"):
+    """
+    Evaluates every row of an aspect_table over a (T x N) longitude array
+    (full GRAHA_NAMES columns) in one pass.
+
+    Returns (dist, active, crossings):
+      dist      (T x S) signed distance from exact aspect, in degrees
+      active    (T x S) True where the aspect holds
+      crossings (k, s) index arrays: row s becomes exact between samples
+                k and k+1 ("degree"), or starts holding at k+1 ("sign")
+
+    "degree" mode compares longitudes within each row's orb; "sign" mode
+    compares whole signs, the traditional Vedic reading.
+    """
+    lons = np.atleast_2d(lons)
+    I, J, offset = table["i"], table["j"], table["offset"]
+
+    if mode == "sign":
+        signs = np.floor(lons / SIGN_SIZE) * SIGN_SIZE
+        dist = wrap180(signs[:, J] - signs[:, I] - offset)
+        active = dist == 0
+        k, s = np.nonzero(~active[:-1] & active[1:])
+        return dist, active, (k, s)
+
+    sep = separation_matrix(lons)
+    dist = wrap180(sep[:, I, J] - offset)
+    active = np.abs(dist) <= table["orb"]
+
+    side = dist < 0
+    jump = np.abs(np.diff(dist, axis=0)) < 180
+    k, s = np.nonzero((side[:-1] != side[1:]) & jump)
+    return dist, active, (k, s)
+
+
+def sample_grid(jd_start, jd_end, step):
+    n = max(int(math.ceil((jd_end - jd_start) / step)), 1) + 1
+    return np.linspace(jd_start, jd_end, n)
+
+
+def refine_aspect(i, j, offset, a, b, fa, fb, ephe=calc_grahas):
+    def f(jd):
+        lons, _ = ephe(jd, [i, j])
+        return wrap180(lons[0, 1] - lons[0, 0] - offset)
+
+    return brent(f, a, b, fa, fb)
+
+
+def relative_station(i, j, a, b, va, vb, ephe=calc_grahas):
+    # instant the separation of i and j stops and turns back
+    def f(jd):
+        _, speed = ephe(jd, [i, j])
+        return speed[0, 1] - speed[0, 0]
+
+    return brent(f, a, b, va, vb)
+
+
+def aspect_brackets(jds, lons, speed, group, ephe=calc_grahas):
+    """
+    (row, a, b, fa, fb) brackets holding exactly one aspect root each.
+
+    A sign change of the offset between two samples is one root. When
+    the separation turns back inside a step (a graha near its station)
+    it can cross and re-cross with no sign change at the samples, so
+    such steps are split at the turn and each half checked again.
+    """
+    dist, _, (ks, ss) = aspect_kernel(lons, group)
+    out = [(s, jds[k], jds[k + 1], dist[k, s], dist[k + 1, s])
+           for k, s in zip(ks.tolist(), ss.tolist())]
+
+    I, J = group["i"], group["j"]
+    rel = speed[:, J] - speed[:, I]
+    side = dist < 0
+    near = np.abs(dist) < 90
+    turn = (np.sign(rel[:-1]) != np.sign(rel[1:])) & (side[:-1] == side[1:]) & near[:-1] & near[1:]
+
+    for k, s in zip(*(x.tolist() for x in np.nonzero(turn))):
+        i, j, offset = I[s], J[s], group["offset"][s]
+        tm = relative_station(i, j, jds[k], jds[k + 1], rel[k, s], rel[k + 1, s], ephe)
+        lm, _ = ephe(tm, [i, j])
+        dm = wrap180(lm[0, 1] - lm[0, 0] - offset)
+        if (dm < 0) != side[k, s]:
+            out.append((s, jds[k], tm, dist[k, s], dm))
+            out.append((s, tm, jds[k + 1], dm, dist[k + 1, s]))
+
+    return out
+
+
+def make_aspect_event(table, s, jd):
+    p1, p2 = GRAHA_NAMES[table["i"][s]], GRAHA_NAMES[table["j"][s]]
+    return {
+        "aspect": table["name"][s],
+        "planets": f"{p1} {table['symbol'][s]} {p2}",
+        "pair": (p1, p2),
+        "jd": jd,
+        "time": jd_to_datetime(jd)
+    }
+
+
+def table_rows(table, mask):
+    return {k: v[mask] for k, v in table.items()}
+
+
+def relative_speed(table):
+    speed = np.array(MAX_SPEED)
+    return speed[table["i"]] + speed[table["j"]]
+
+
+def pair_cycle(table):
+    """
+    Days per row for its pair to run through every relative position once:
+    the mean synodic period (from the mean motions, or SOLAR_SYNODIC for
+    pairs that move with the Sun) times CYCLE_SLACK.
+    """
+    mean = np.array(MEAN_SPEED)
+    solar = np.array([SOLAR_SYNODIC.get(g, 0.0) for g in GRAHA_NAMES])
+    i, j = table["i"], table["j"]
+    diff = np.abs(mean[i] - mean[j])
+    with np.errstate(divide="ignore"):
+        days = np.where(diff > 1e-6, 360 / diff, np.maximum(solar[i], solar[j]))
+    return days * CYCLE_SLACK
+
+
+def pair_schedule(table, jd_start, jd_end, cycles=None):
+    """
+    Per-row sampling step and horizon for find_aspect_events.
+
+    A row's step comes from its own peak relative speed (BRACKET_DEG of
+    relative motion), capped by STATION_SAFE_STEP of both bodies so a
+    step holds at most one turn of the separation, then rounded down to
+    the fastest row's step times a power of two: coarser grids are exact
+    subsets of finer ones and shared samples are reused by a
+    SampleStream / PositionCache.
+
+    With `cycles`, a row's horizon ends after that many of its pair's
+    cycles (pair_cycle): about a month for lunar pairs, decades for
+    गुरु–शनि, so each reachable aspect turns up at least once per cycle.
+    Returns (base, level, horizon_end); a row's step is base * 2**level.
+    """
+    rel = relative_speed(table)
+    safe = np.array(STATION_SAFE_STEP, dtype=np.float64)
+    step = np.minimum(BRACKET_DEG / rel, np.minimum(safe[table["i"]], safe[table["j"]]))
+
+    base = BRACKET_DEG / rel.max()
+    level = np.floor(np.log2(step / base) + 1e-9).clip(0).astype(np.int64)
+
+    end = np.full(len(rel), float(jd_end))
+    if cycles is not None:
+        end = np.minimum(end, jd_start + cycles * pair_cycle(table))
+
+    return base, level, end
+
+
+def reachable(table):
+    # rows whose offset the pair can actually reach
+    ok = np.ones(len(table["i"]), dtype=bool)
+    for (a, b), sep in MAX_SEPARATION.items():
+        a, b = GRAHA_NAMES.index(a), GRAHA_NAMES.index(b)
+        pair = ((table["i"] == a) & (table["j"] == b)) | ((table["i"] == b) & (table["j"] == a))
+        offset = np.minimum(table["offset"] % 360, -table["offset"] % 360)
+        ok &= ~pair | (offset <= sep)
+    return ok
+
+
+def horizon_check(jd_start, table=None, cycles=HORIZON_CYCLES, ephe=calc_grahas):
+    """
+    (aspect, p1, p2) of every reachable row with no event inside its
+    `cycles` horizon from jd_start; empty when the horizons are long enough.
+    """
+    table = aspect_table(tuple(ASPECTS), drishti=True) if table is None else table
+    end = jd_start + cycles * pair_cycle(table).max()
+    found = {(e["aspect"],) + e["pair"] for e in find_aspect_events(jd_start, end, table, ephe, cycles)}
+    return sorted({(name, GRAHA_NAMES[i], GRAHA_NAMES[j])
+                   for name, i, j, ok in zip(table["name"], table["i"], table["j"], reachable(table))
+                   if ok and (name, GRAHA_NAMES[i], GRAHA_NAMES[j]) not in found})
+
+
+def nested_grid(jd_start, jd_end, step):
+    n = int(math.ceil((jd_end - jd_start) / step))
+    jds = jd_start + np.arange(n) * step
+    return np.append(jds, jd_end)
+
+
+def find_aspect_events(jd_start, jd_end, table=None, ephe=calc_grahas, cycles=None):
+    """
+    Exact aspect times in [jd_start, jd_end] for every row of `table`
+    (conjunctions and oppositions of all pairs by default).
+
+    Rows are grouped by pair_schedule step; each group is sampled once
+    on its own grid, aspect_brackets isolates every root of the aspect
+    offset, and each is refined with Brent's method using only the two
+    bodies involved. `cycles` cuts each row to its own horizon.
+    """
+    table = aspect_table() if table is None else table
+    if not len(table["i"]) or jd_end <= jd_start:
+        return []
+
+    base, level, end = pair_schedule(table, jd_start, jd_end, cycles)
+    events = []
+
+    for lv in np.unique(level).tolist():
+        group = table_rows(table, level == lv)
+        group_end = end[level == lv]
+
+        jds = nested_grid(jd_start, group_end.max(), base * 2 ** lv)
+        cols = sorted(set(group["i"].tolist()) | set(group["j"].tolist()))
+        lons = np.zeros((len(jds), len(GRAHA_NAMES)))
+        speed = np.zeros((len(jds), len(GRAHA_NAMES)))
+        lons[:, cols], speed[:, cols] = ephe(jds, cols)
+
+        for s, a, b, fa, fb in aspect_brackets(jds, lons, speed, group, ephe):
+            if a >= group_end[s]:
+                continue
+            jd = refine_aspect(group["i"][s], group["j"][s], group["offset"][s],
+                               a, b, fa, fb, ephe)
+            if jd <= group_end[s]:
+                events.append(make_aspect_event(group, s, jd))
+
+    events.sort(key=lambda e: e["jd"])
+    return events
+
+
+# ================= LUNATIONS =================
+SUN = GRAHA_NAMES.index("सूर्य")
+MOON = GRAHA_NAMES.index("चन्द्र")
+
+SYNODIC_MONTH = 29.530589
+
+# Tithi span in Moon–Sun elongation: Amavasya is the 30th tithi
+# (348°→360°, i.e. the last 12° before conjunction), Purnima the 15th.
+LUNATIONS = {
+    "Amavasya": (348.0, 360.0),
+    "Purnima": (168.0, 180.0)
+}
+
+
+def sun_moon_elongation(jd, ephe=calc_grahas):
+    lons, speed = ephe(jd, [SUN, MOON])
+    return (lons[0, 1] - lons[0, 0]) % 360, speed[0, 1] - speed[0, 0]
+
+
+def solve_elongation(angle, jd_guess, xtol=XTOL, maxiter=20, ephe=calc_grahas):
+    """
+    Newton iteration on Moon–Sun elongation using the calc_ut speeds.
+    Converges to the crossing of `angle` nearest to jd_guess (within
+    about half a lunation), normally in 3–4 steps.
+    """
+    jd = jd_guess
+    for _ in range(maxiter):
+        e, v = sun_moon_elongation(jd, ephe)
+        dt = wrap180(e - angle) / v
+        jd -= dt
+        if abs(dt) < xtol:
+            break
+    return jd
+
+
+def elongation_crossings(jd_start, jd_end, angle, ephe=calc_grahas):
+    angle %= 360
+    e, v = sun_moon_elongation(jd_start, ephe)
+    jd = solve_elongation(angle, jd_start + ((angle - e) % 360) / v, ephe=ephe)
+
+    out = []
+    while jd < jd_end:
+        if jd >= jd_start:
+            out.append(jd)
+        jd = solve_elongation(angle, jd + SYNODIC_MONTH, ephe=ephe)
+
+    return out
+
+
+def find_lunations(jd_start, jd_end, ephe=calc_grahas):
+    """
+    Every Amavasya / Purnima whose exact syzygy falls in [jd_start, jd_end],
+    with tithi start and end solved exactly from Sun and Moon only.
+    """
+    events = []
+
+    for name, (start_angle, end_angle) in LUNATIONS.items():
+        span = (end_angle - start_angle) / (360 / SYNODIC_MONTH)
+
+        for end in elongation_crossings(jd_start, jd_end, end_angle, ephe):
+            start = solve_elongation(start_angle, end - span, ephe=ephe)
+            events.append({
+                "name": name,
+                "start_jd": start,
+                "end_jd": end,
+                "start": jd_to_datetime(start),
+                "end": jd_to_datetime(end)
+            })
+
+    events.sort(key=lambda e: e["end_jd"])
+    return events
+
+
+# ================= INGRESSES =================
+NAK_SIZE = 13 + 1/3
+PADA_SIZE = NAK_SIZE / 4
+N_PADAS = 108
+
+# Every sign and nakshatra boundary is also a pada boundary, so all
+# levels are tracked on the pada grid; value = padas per cell.
+INGRESS_LEVELS = {"sign": 9, "nakshatra": 4, "pada": 1}
+INGRESS_TYPES = {
+    "sign": "Zodiac Change",
+    "nakshatra": "Nakshatra Change",
+    "pada": "Pada Change"
+}
+
+# Longest step (days) between two samples of one graha. Kept under half
+# the shortest retrograde / direct run, so a step never hides two
+# stations; a single station inside a step is located exactly.
+STATION_SAFE_STEP = [30, 30, 20, 8, 40, 15, 40, 60, 60]
+
+
+def graha_state(c, jd, ephe=calc_grahas):
+    lons, speed = ephe(jd, [c])
+    return lons[0, 0], speed[0, 0]
+
+
+def is_boundary(k, mults):
+    return any(k % m == 0 for m in mults)
+
+
+def next_boundary_distance(lon, speed, mults):
+    # degrees to the next relevant boundary in the direction of motion
+    if not mults:
+        raise ValueError("no ingress levels given")
+    u = lon / PADA_SIZE
+    if speed >= 0:
+        k = math.floor(u) + 1
+        while not is_boundary(k, mults):
+            k += 1
+        return (k - u) * PADA_SIZE
+
+    k = math.ceil(u) - 1
+    while not is_boundary(k, mults):
+        k -= 1
+    return (u - k) * PADA_SIZE
+
+
+def find_station(c, a, b, fa=None, fb=None, ephe=calc_grahas):
+    def f(jd):
+        return graha_state(c, jd, ephe)[1]
+
+    return brent(f, a, b, fa, fb)
+
+
+def segment_ingresses(c, ta, la, tb, lb, mults, ephe=calc_grahas):
+    """
+    Boundary crossings of graha c between two samples with no station
+    in between, each refined with Brent's method.
+    """
+    ua = la / PADA_SIZE
+    ub = (la + wrap180(lb - la)) / PADA_SIZE
+
+    if ub > ua:
+        ks = range(math.floor(ua) + 1, math.floor(ub) + 1)
+    else:
+        ks = range(math.ceil(ua) - 1, math.ceil(ub) - 1, -1)
+
+    out = []
+    for k in ks:
+        if not is_boundary(k, mults):
+            continue
+
+        b = (k * PADA_SIZE) % 360
+
+        def f(jd):
+            return wrap180(graha_state(c, jd, ephe)[0] - b)
+
+        jd = brent(f, ta, tb, wrap180(la - b), wrap180(lb - b))
+        out.append((jd, k, ub > ua))
+
+    return out
+
+
+def graha_ingresses(c, jd_start, jd_end, levels=("sign", "nakshatra"), ephe=calc_grahas):
+    mults = [INGRESS_LEVELS[lv] for lv in levels]
+    if not mults:
+        return []
+    crossings = []
+
+    t0 = jd_start
+    l0, v0 = graha_state(c, t0, ephe)
+
+    while t0 < jd_end:
+        if v0 == 0:
+            h = STATION_SAFE_STEP[c]
+        else:
+            # jump just past the predicted crossing
+            h = next_boundary_distance(l0, v0, mults) / abs(v0) * 1.05 + 1e-4
+        h = min(h, STATION_SAFE_STEP[c], jd_end - t0)
+
+        t1 = t0 + h
+        l1, v1 = graha_state(c, t1, ephe)
+
+        if v0 * v1 < 0:
+            ts = find_station(c, t0, t1, v0, v1, ephe)
+            ls, _ = graha_state(c, ts, ephe)
+            crossings += segment_ingresses(c, t0, l0, ts, ls, mults, ephe)
+            crossings += segment_ingresses(c, ts, ls, t1, l1, mults, ephe)
+        else:
+            crossings += segment_ingresses(c, t0, l0, t1, l1, mults, ephe)
+
+        t0, l0, v0 = t1, l1, v1
+
+    events = []
+    for jd, k, direct in crossings:
+        for level in levels:
+            m = INGRESS_LEVELS[level]
+            if k % m:
+                continue
+
+            n = N_PADAS // m
+            hi, lo = (k // m) % n, (k // m - 1) % n
+
+            events.append({
+                "type": INGRESS_TYPES[level],
+                "level": level,
+                "planet": GRAHA_NAMES[c],
+                "from": lo if direct else hi,
+                "to": hi if direct else lo,
+                "retro": not direct,
+                "jd": jd,
+                "time": jd_to_datetime(jd)
+            })
+
+    return events
+
+
+def find_ingresses(jd_start, jd_end, planets=None, levels=("sign", "nakshatra"),
+                   ephe=calc_grahas):
+    """
+    Exact sign / nakshatra / pada ingress times for each graha in
+    [jd_start, jd_end]. "from" / "to" are cell indices at that level;
+    no levels, no events.
+
+    Each graha is stepped on its own: the next boundary crossing is
+    predicted from the calc_ut longitude speed and then refined, so the
+    cost follows the number of events rather than the time span.
+    """
+    planets = GRAHA_NAMES if planets is None else planets
+
+    events = []
+    for name in planets:
+        events += graha_ingresses(GRAHA_NAMES.index(name), jd_start, jd_end, levels, ephe)
+
+    events.sort(key=lambda e: e["jd"])
+    return events
+
+
+# ================= STATIONS =================
+# Sun and Moon never station and the mean node is always retrograde
+STATION_GRAHAS = ["मंगल", "बुध", "बृहस्पति", "शुक्र", "शनि"]
+STATION_TYPES = {True: "Station Retrograde", False: "Station Direct"}
+
+
+def find_stations(jd_start, jd_end, planets=None, ephe=calc_grahas):
+    """
+    Exact times where the longitude speed of each graha crosses zero.
+    """
+    planets = STATION_GRAHAS if planets is None else planets
+
+    events = []
+    for name in planets:
+        c = GRAHA_NAMES.index(name)
+        jds = sample_grid(jd_start, jd_end, STATION_SAFE_STEP[c])
+        _, speed = ephe(jds, [c])
+        v = speed[:, 0]
+
+        for k in crossing_indices(v):
+            jd = find_station(c, jds[k], jds[k + 1], v[k], v[k + 1], ephe)
+            retro = bool(v[k] > 0)
+            events.append({
+                "type": STATION_TYPES[retro],
+                "planet": name,
+                "retro": retro,
+                "jd": jd,
+                "time": jd_to_datetime(jd)
+            })
+
+    events.sort(key=lambda e: e["jd"])
+    return events
+
+
+# ================= RETROGRADE TIMELINE =================
+class RetroTimeline:
+    """
+    Retrograde intervals of every graha over [jd_start, jd_end], built
+    once from find_stations. "Is X retrograde at t" and "stations between
+    t1 and t2" are then binary searches; instants outside the span fall
+    back to the speed sign from `ephe`. Precomputed `stations` (e.g. from
+    an EventIndex) skip the scan.
+    """
+
+    def __init__(self, jd_start, jd_end, ephe=calc_grahas, stations=None):
+        self.jd_start, self.jd_end = jd_start, jd_end
+        self.ephe = ephe
+
+        _, speed = ephe(jd_start)
+        self.initial = dict(zip(GRAHA_NAMES, (speed[0] < 0).tolist()))
+
+        self.events = find_stations(jd_start, jd_end, ephe=ephe) if stations is None \
+            else stations
+        self.event_jds = np.array([e["jd"] for e in self.events])
+
+        # per graha: sorted station JDs and the retro state after each one
+        self.stations = {}
+        for name in GRAHA_NAMES:
+            own = [e for e in self.events if e["planet"] == name]
+            self.stations[name] = (np.array([e["jd"] for e in own]),
+                                   np.array([e["retro"] for e in own], dtype=bool))
+
+    def covers(self, jd):
+        return self.jd_start <= jd <= self.jd_end
+
+    def is_retro(self, name, jd):
+        if not self.covers(jd):
+            _, speed = self.ephe(jd, [GRAHA_NAMES.index(name)])
+            return bool(speed[0, 0] < 0)
+
+        jds, after = self.stations[name]
+        k = int(np.searchsorted(jds, jd, side="right"))
+        return bool(after[k - 1]) if k else self.initial[name]
+
+    def retro_at(self, jd):
+        return {name: self.is_retro(name, jd) for name in GRAHA_NAMES}
+
+    def intervals(self, name):
+        """
+        (start_jd, end_jd) retrograde runs, clipped to the span.
+        """
+        jds, after = self.stations[name]
+        edges = [self.jd_start] + jds.tolist() + [self.jd_end]
+        states = [self.initial[name]] + after.tolist()
+        return [(a, b) for a, b, r in zip(edges[:-1], edges[1:], states) if r]
+
+    def between(self, jd_start, jd_end):
+        a, b = np.searchsorted(self.event_jds, [jd_start, jd_end])
+        return self.events[a:b]
+
+
+# ================= STREAMING =================
+# Window length of one stream step, as degrees of the fastest body's
+# motion (aspects: of relative motion); about one lunar cycle for the Moon.
+STREAM_DEG = 360.0
+STATION_CHUNK_DAYS = 365.25
+LUNATION_CHUNK_DAYS = 6 * SYNODIC_MONTH
+
+# Default end of a stream: Swiss Ephemeris without extra data files
+# (its built-in Moshier range) stops early in 3003 and raises past it;
+# 3000-01-01 leaves room for detectors that look a little ahead.
+STREAM_END_JD = 2816787.5  # 3000-01-01
+
+# Events within this many days of a cursor or window edge are matched
+# by identity (every field except the times) instead of by time.
+CURSOR_TOL = 1e-3
+TIME_FIELDS = ("jd", "time", "start_jd", "end_jd", "start", "end")
+
+
+def event_jd(e):
+    # lunations are placed at their exact syzygy
+    return e["jd"] if "jd" in e else e["end_jd"]
+
+
+def event_key(e):
+    return tuple((k, v) for k, v in e.items() if k not in TIME_FIELDS)
+
+
+def as_cursor(cursor):
+    # a bare JD, or (jd, keys of the events already taken near jd)
+    return cursor if isinstance(cursor, tuple) else (cursor, frozenset())
+
+
+def stream_events(detector, cursor, chunk_days, jd_limit=STREAM_END_JD):
+    """
+    Lazily yields the events of detector(a, b) in time order over
+    consecutive `chunk_days` windows from `cursor` up to `jd_limit`.
+    Only the windows actually consumed are ever scanned; a stream with
+    nothing left before jd_limit simply ends.
+
+    A root refined again from a different bracket can move by ~XTOL, so
+    events near a cursor or window edge are matched by identity: each
+    window starts CURSOR_TOL early and drops what was already yielded.
+    """
+    jd, seen = as_cursor(cursor)
+    a = jd - CURSOR_TOL if seen else jd
+
+    while a < jd_limit:
+        b = min(a + chunk_days, jd_limit)
+        edge = set()
+
+        for e in detector(a, b):
+            t = event_jd(e)
+            # windows are closed, so an event on b belongs to the next one
+            if t >= b:
+                continue
+            key = event_key(e)
+            if t <= a + 2 * CURSOR_TOL and key in seen:
+                continue
+            if t >= b - CURSOR_TOL:
+                edge.add(key)
+            yield e
+
+        seen = edge
+        a = b
+
+
+def event_cursor(events, cursor):
+    """
+    Cursor resuming right after the last of `events`, which were taken
+    in order from a stream started at `cursor`.
+    """
+    jd, seen = as_cursor(cursor)
+    if not events:
+        return jd, seen
+
+    last = event_jd(events[-1])
+    recent = {event_key(e) for e in events if event_jd(e) >= last - CURSOR_TOL}
+    if last - jd <= CURSOR_TOL:
+        recent |= seen
+    return last, frozenset(recent)
+
+
+def indexed(index, query, live):
+    # precomputed EventIndex answer when it covers the window, else a scan
+    def detector(a, b):
+        if index is not None and index.covers(a, b):
+            return query(a, b)
+        return live(a, b)
+    return detector
+
+
+def iter_aspect_events(cursor, table=None, ephe=calc_grahas, index=None):
+    # rows the pair can never reach would keep the stream scanning forever
+    table = aspect_table() if table is None else table
+    table = table_rows(table, reachable(table))
+    if not len(table["i"]):
+        return iter(())
+
+    detector = indexed(index,
+                       lambda a, b: index.aspects(a, b, table),
+                       lambda a, b: find_aspect_events(a, b, table, ephe))
+    return stream_events(detector, cursor, STREAM_DEG / relative_speed(table).max())
+
+
+def iter_ingresses(cursor, planets=None, levels=("sign", "nakshatra"), ephe=calc_grahas,
+                   index=None):
+    planets = GRAHA_NAMES if planets is None else planets
+    if not planets or not levels:
+        return iter(())
+
+    detector = indexed(index,
+                       lambda a, b: index.ingresses(a, b, planets, levels),
+                       lambda a, b: find_ingresses(a, b, planets, levels, ephe))
+    fastest = max(MAX_SPEED[GRAHA_NAMES.index(p)] for p in planets)
+    return stream_events(detector, cursor, STREAM_DEG / fastest)
+
+
+def iter_lunations(cursor, ephe=calc_grahas, index=None):
+    detector = indexed(index,
+                       lambda a, b: index.lunations(a, b),
+                       lambda a, b: find_lunations(a, b, ephe))
+    return stream_events(detector, cursor, LUNATION_CHUNK_DAYS)
+
+
+def iter_stations(cursor, planets=None, ephe=calc_grahas, index=None):
+    # only STATION_GRAHAS ever station (सूर्य, चन्द्र never; the mean nodes always retrograde)
+    planets = STATION_GRAHAS if planets is None else [p for p in planets if p in STATION_GRAHAS]
+    if not planets:
+        return iter(())
+
+    detector = indexed(index,
+                       lambda a, b: [e for e in index.stations(a, b) if e["planet"] in planets],
+                       lambda a, b: find_stations(a, b, planets, ephe))
+    return stream_events(detector, cursor, STATION_CHUNK_DAYS)
+
+
+def tagged(kind, events):
+    for e in events:
+        yield event_jd(e), kind, e
+
+
+def next_events(streams, cursors, n):
+    """
+    The next n events, in time order, across several resumable streams.
+
+    streams: {kind: fn(cursor) -> event generator}
+    cursors: {kind: cursor}
+    Returns ([(kind, event)], cursors to pass back for the following page).
+    """
+    merged = heapq.merge(*(tagged(kind, streams[kind](cursors[kind])) for kind in streams),
+                         key=lambda x: x[0])
+    page = [(kind, e) for _, kind, e in islice(merged, n)]
+
+    new = {}
+    for kind in streams:
+        new[kind] = event_cursor([e for k, e in page if k == kind], cursors[kind])
+    return page, new
+
+
+# ================= SLIDING WINDOWS =================
+def merge_events(*lists):
+    """
+    Time-ordered union of event lists that may overlap at their edges;
+    the same event found twice (within CURSOR_TOL) is kept once.
+    """
+    merged = sorted((e for events in lists for e in events), key=event_jd)
+
+    out = []
+    recent = {}
+    for e in merged:
+        key, t = event_key(e), event_jd(e)
+        if t - recent.get(key, -math.inf) <= CURSOR_TOL:
+            continue
+        recent[key] = t
+        out.append(e)
+    return out
+
+
+class WindowCache:
+    """
+    Events of one detector over a sliding [jd_start, jd_end] window.
+
+    When the window moves, only the newly exposed head / tail is handed
+    to the detector and events that fell out are dropped, so the cost
+    follows the shift rather than the span. A window that no longer
+    overlaps the cached one is scanned afresh.
+    """
+
+    def __init__(self):
+        self.jd_start = self.jd_end = None
+        self.events = []
+        self.scanned = 0.0
+
+    def query(self, detector, jd_start, jd_end):
+        if self.jd_start is None or jd_end < self.jd_start or jd_start > self.jd_end:
+            self.events = merge_events(detector(jd_start, jd_end))
+            self.scanned = jd_end - jd_start
+        else:
+            head = detector(jd_start, self.jd_start) if jd_start < self.jd_start else []
+            tail = detector(self.jd_end, jd_end) if jd_end > self.jd_end else []
+            kept = [e for e in self.events if jd_start <= event_jd(e) <= jd_end]
+
+            self.events = merge_events(head, kept, tail)
+            self.scanned = max(self.jd_start - jd_start, 0) + max(jd_end - self.jd_end, 0)
+
+        self.jd_start, self.jd_end = jd_start, jd_end
+        return list(self.events)
+
+
+# ================= FUSED SCAN =================
+class SampleStream:
+    """
+    Memoizing drop-in for calc_grahas shared by every detector of one
+    scan, so each (instant, graha) pair is computed at most once.
+    """
+
+    def __init__(self, ephe=calc_grahas):
+        self.ephe = ephe
+        self.samples = {}
+        self.calls = 0
+        self.hits = 0
+
+    def __call__(self, jds, cols=None):
+        jds = to_jd_array(jds).tolist()
+        cols = list(range(len(GRAHA_NAMES))) if cols is None else list(cols)
+        # केतु is stored as राहु and flipped on the way out
+        base = [RAHU if c == KETU else c for c in cols]
+        wanted = sorted(set(base))
+
+        missing = {}
+        for jd in jds:
+            need = tuple(c for c in wanted if (jd, c) not in self.samples)
+            self.hits += len(wanted) - len(need)
+            if need:
+                missing.setdefault(need, []).append(jd)
+
+        for need, group in missing.items():
+            lons, speed = self.ephe(group, need)
+            self.calls += len(group) * len(need)
+            for i, jd in enumerate(group):
+                for k, c in enumerate(need):
+                    self.samples[(jd, c)] = (lons[i, k], speed[i, k])
+
+        lons = np.empty((len(jds), len(cols)))
+        speed = np.empty((len(jds), len(cols)))
+        for i, jd in enumerate(jds):
+            for k, (c, b) in enumerate(zip(cols, base)):
+                lon, v = self.samples[(jd, b)]
+                lons[i, k] = (lon + 180) % 360 if c == KETU else lon
+                speed[i, k] = v
+
+        return lons, speed
+
+
+def scan_all(detectors, ephe=calc_grahas):
+    """
+    Runs every detector against one shared SampleStream.
+
+    detectors: {name: fn(ephe) -> list of events}
+    Returns (results, timings), both keyed by detector name.
+    """
+    stream = SampleStream(ephe)
+    results, timings = {}, {}
+
+    for name, detect in detectors.items():
+        calls, hits = stream.calls, stream.hits
+        t0 = time.perf_counter()
+
+        results[name] = detect(stream)
+
+        timings[name] = {
+            "ms": (time.perf_counter() - t0) * 1000,
+            "computed": stream.calls - calls,
+            "reused": stream.hits - hits,
+            "events": len(results[name])
+        }
+
+    return results, timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the per-pair aspect horizons")
+    parser.add_argument("--start-year", type=int, default=1900)
+    parser.add_argument("--years", type=int, default=200)
+    parser.add_argument("--starts", type=int, default=10, help="start dates spread over the span")
+    args = parser.parse_args()
+
+    import swisseph as swe
+
+    a = swe.julday(args.start_year, 1, 1)
+    failed = 0
+    for jd in a + np.linspace(0, args.years * 365.25, args.starts, endpoint=False) + 0.37:
+        t0 = time.perf_counter()
+        missing = horizon_check(jd)
+        failed += bool(missing)
+        print(f"{jd_to_datetime(jd):%Y-%m-%d}: {len(missing)} missing "
+              f"({time.perf_counter() - t0:.1f}s) {missing[:3]}")
+    print("ok" if not failed else f"{failed} start dates short of an event")
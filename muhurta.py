@@ -0,0 +1,190 @@
+"""
+Choghadiya, hora and Rahu kaal / Yamaganda / Gulika timelines.
+
+    python muhurta.py --district Ujjain --date 2026-10-18 --days 1
+
+Every slot is a fixed fraction of the day (sunrise to sunset) or night
+(sunset to next sunrise) and its name follows the weekday, so a whole
+date range is one broadcast over the cached rise / set arrays. Each kind
+is kept as sorted start / end arrays and the running slot is a binary
+search.
+"""
+import argparse
+import datetime
+import time
+
+import numpy as np
+import pandas as pd
+
+from riseset import IST, jd_to_local, load_districts, load_rise_set
+
+# Weekday lords in hora (Chaldean, descending) order; the choghadiya
+# of each lord shares its position, so one cycle index drives both
+HORA_LORDS = ["सूर्य","शुक्र","बुध","चन्द्र","शनि","बृहस्पति","मंगल"]
+CHOGHADIYA_NAMES = ["उद्वेग","चर","लाभ","अमृत","काल","शुभ","रोग"]
+
+# Day eighth (0-based, from sunrise) ruled by each kaal, Sunday first
+KAALS = {
+    "rahu_kaal": [7, 1, 6, 4, 5, 3, 2],
+    "yamaganda": [4, 3, 2, 1, 0, 6, 5],
+    "gulika": [6, 5, 4, 3, 2, 1, 0]
+}
+KAAL_NAMES = {"rahu_kaal": "राहु काल", "yamaganda": "यमगण्ड", "gulika": "गुलिक काल"}
+
+
+# ================= SLOT TIMELINE =================
+class SlotTimeline:
+    """
+    Consecutive or disjoint named intervals as sorted arrays; `at` is a
+    binary search on the start times.
+    """
+
+    def __init__(self, start_jd, end_jd, names, period=None):
+        order = np.argsort(start_jd, kind="stable")
+        self.start_jd = np.asarray(start_jd)[order]
+        self.end_jd = np.asarray(end_jd)[order]
+        self.names = np.asarray(names, dtype=object)[order]
+        # "day" / "night" per slot where that applies
+        self.period = None if period is None else np.asarray(period, dtype=object)[order]
+
+    def __len__(self):
+        return len(self.start_jd)
+
+    def index(self, jd):
+        # -1 when no slot covers jd
+        i = np.searchsorted(self.start_jd, jd, side="right") - 1
+        if i < 0 or jd >= self.end_jd[i]:
+            return -1
+        return int(i)
+
+    def at(self, jd):
+        """(name, start_jd, end_jd) of the slot covering `jd`, or None."""
+        i = self.index(jd)
+        if i < 0:
+            return None
+        return self.names[i], float(self.start_jd[i]), float(self.end_jd[i])
+
+    def between(self, jd_start, jd_end):
+        a = np.searchsorted(self.end_jd, jd_start, side="right")
+        b = np.searchsorted(self.start_jd, jd_end)
+        return self.frame(slice(a, b))
+
+    def frame(self, rows=slice(None), tz=IST):
+        df = pd.DataFrame({
+            "name": self.names[rows],
+            "start_jd": self.start_jd[rows],
+            "end_jd": self.end_jd[rows]
+        })
+        if self.period is not None:
+            df.insert(1, "period", self.period[rows])
+        df["start"] = jd_to_local(df["start_jd"].to_numpy(), tz)
+        df["end"] = jd_to_local(df["end_jd"].to_numpy(), tz)
+        return df
+
+
+# ================= ENGINE =================
+def vara_lord(weekday):
+    # cycle position of the weekday's lord (Sunday = 0); each vara
+    # starts three lords further on
+    return (3 * weekday) % 7
+
+
+def split(start, length, parts):
+    # (D x parts) start / end of equal parts of each [start, start + length)
+    edges = start[:, None] + length[:, None] * np.arange(parts + 1) / parts
+    return edges[:, :-1], edges[:, 1:]
+
+
+def muhurta_timelines(sunrise, sunset, next_sunrise, weekday):
+    """
+    Arrays of D days (sunrise / sunset / next sunrise JDs, weekday with
+    Sunday = 0) -> {kind: SlotTimeline} for "choghadiya" (8 day + 8
+    night slots per day), "hora" (12 + 12) and the three kaals.
+    """
+    sunrise, sunset = np.asarray(sunrise, float), np.asarray(sunset, float)
+    next_sunrise, weekday = np.asarray(next_sunrise, float), np.asarray(weekday)
+    day, night = sunset - sunrise, next_sunrise - sunset
+    lord = vara_lord(weekday)[:, None]
+    D = len(sunrise)
+    periods = np.repeat([["day", "night"]], D, axis=0)
+
+    # choghadiya: day slots step one lord on, night slots start five on
+    # and step back two
+    k = np.arange(8)
+    ds, de = split(sunrise, day, 8)
+    ns, ne = split(sunset, night, 8)
+    cho = np.hstack([(lord + k) % 7, (lord + 5 - 2 * k) % 7])
+    out = {"choghadiya": SlotTimeline(
+        np.hstack([ds, ns]).ravel(), np.hstack([de, ne]).ravel(),
+        np.asarray(CHOGHADIYA_NAMES, dtype=object)[cho].ravel(),
+        np.repeat(periods, 8, axis=1).ravel()
+    )}
+
+    # horas run on through day and night from the weekday's lord
+    ds, de = split(sunrise, day, 12)
+    ns, ne = split(sunset, night, 12)
+    hora = (lord + np.arange(24)) % 7
+    out["hora"] = SlotTimeline(
+        np.hstack([ds, ns]).ravel(), np.hstack([de, ne]).ravel(),
+        np.asarray(HORA_LORDS, dtype=object)[hora].ravel(),
+        np.repeat(periods, 12, axis=1).ravel()
+    )
+
+    for kind, parts in KAALS.items():
+        part = np.asarray(parts)[weekday]
+        start = sunrise + day * part / 8
+        out[kind] = SlotTimeline(start, start + day / 8, [KAAL_NAMES[kind]] * D)
+
+    return out
+
+
+def sun_frames(location, start_date, end_date, lat, lon, rise_set=load_rise_set):
+    """
+    (sunrise, sunset, next_sunrise, weekday) arrays for each date in
+    [start_date, end_date], read from the cached per-year rise / set
+    tables (`rise_set(location, year, lat, lon)`).
+    """
+    last = end_date + datetime.timedelta(days=1)
+    rows = {"sunrise": [], "sunset": []}
+    for year in range(start_date.year, last.year + 1):
+        table = rise_set(location, year, lat, lon)
+        a = max(start_date, datetime.date(year, 1, 1))
+        b = min(last, datetime.date(year, 12, 31))
+        span = table.span(a, b)
+        rows["sunrise"].append(span["sunrise"])
+        rows["sunset"].append(span["sunset"])
+
+    rises = np.concatenate(rows["sunrise"])
+    sets = np.concatenate(rows["sunset"])[:-1]
+    dates = pd.date_range(start_date, end_date, freq="D")
+    return rises[:-1], sets, rises[1:], ((dates.dayofweek + 1) % 7).to_numpy()
+
+
+def load_muhurta(location, start_date, end_date, lat, lon, rise_set=load_rise_set):
+    return muhurta_timelines(*sun_frames(location, start_date, end_date, lat, lon, rise_set))
+
+
+if __name__ == "__main__":
+    from ephemeris import datetime_to_jd
+
+    parser = argparse.ArgumentParser(description="Print choghadiya, hora and kaal timelines")
+    parser.add_argument("--district", default="Ujjain")
+    parser.add_argument("--date", default=datetime.date.today().isoformat())
+    parser.add_argument("--days", type=int, default=1)
+    args = parser.parse_args()
+
+    districts = load_districts()
+    row = districts[districts["District"].str.lower() == args.district.lower()].iloc[0]
+    label = f"{row['District']} – {row['State']}"
+    start = datetime.date.fromisoformat(args.date)
+    end = start + datetime.timedelta(days=args.days - 1)
+
+    t0 = time.perf_counter()
+    timelines = load_muhurta(label, start, end, row["Latitude"], row["Longitude"])
+    print(f"{label}: {args.days} days in {(time.perf_counter() - t0) * 1e3:.1f} ms")
+
+    now = datetime_to_jd(datetime.datetime.now(datetime.timezone.utc))
+    for kind, timeline in timelines.items():
+        df = timeline.frame()
+        print(f"\n{kind} ({len(df)} slots), now: {timeline.at(now)}")
+        print(df.drop(columns=["start_jd", "end_jd"]).head(24).to_string(index=False))
@@ -0,0 +1,248 @@
+"""
+Panchang calendar: every tithi, karana, nakshatra and yoga segment with
+exact start / end times, plus sunrise-anchored Vedic days.
+
+    python panchang.py --district Ujjain --year 2026
+
+All four angas are monotonic functions of the Sun and Moon longitudes,
+so one batched sample of the two bodies over the span gives every
+boundary at once: each is bracketed on the unwrapped curve, placed by
+Hermite interpolation from the sampled speeds, then polished with one
+more batched ephemeris call for all boundaries together.
+"""
+import argparse
+import datetime
+import time
+
+import numpy as np
+import pandas as pd
+import swisseph as swe
+
+from ephemeris import calc_grahas
+from events import MOON, SUN, NAK_SIZE, wrap180
+from muhurta import sun_frames
+from riseset import IST, jd_to_local, load_districts, load_rise_set, local_midnight_jd
+
+# ================= NAMES =================
+TITHI_NAMES = ["प्रतिपदा","द्वितीया","तृतीया","चतुर्थी","पंचमी","षष्ठी","सप्तमी","अष्टमी","नवमी","दशमी","एकादशी","द्वादशी","त्रयोदशी","चतुर्दशी","पूर्णिमा","प्रतिपदा","द्वितीया","तृतीया","चतुर्थी","पंचमी","षष्ठी","सप्तमी","अष्टमी","नवमी","दशमी","एकादशी","द्वादशी","त्रयोदशी","चतुर्दशी","अमावस्या"]
+
+NAKSHATRA_NAMES = [
+    "अश्विनी","भरणी","कृत्तिका","रोहिणी","मृगशिरा","आर्द्रा","पुनर्वसु",
+    "पुष्य","आश्लेषा","मघा","पूर्व फाल्गुनी","उत्तर फाल्गुनी","हस्त","चित्रा",
+    "स्वाति","विशाखा","अनुराधा","ज्येष्ठा","मूला","पूर्वाषाढा","उत्तराषाढा",
+    "श्रवण","धनिष्ठा","शतभिषा","पूर्वभाद्रपदा","उत्तरभाद्रपदा","रेवती"
+]
+
+YOGA_NAMES = [
+    "विष्कम्भ","प्रीति","आयुष्मान","सौभाग्य","शोभन","अतिगण्ड","सुकर्मा",
+    "धृति","शूल","गण्ड","वृद्धि","ध्रुव","व्याघात","हर्षण","वज्र","सिद्धि",
+    "व्यतीपात","वरीयान","परिघ","शिव","सिद्ध","साध्य","शुभ","शुक्ल","ब्रह्म",
+    "इन्द्र","वैधृति"
+]
+
+# 60 half-tithis: किंस्तुघ्न first, the seven movable karanas eight
+# times over, then the three fixed ones before अमावस्या ends
+MOVABLE_KARANAS = ["बव","बालव","कौलव","तैतिल","गर","वणिज","विष्टि"]
+KARANA_NAMES = ["किंस्तुघ्न"] + MOVABLE_KARANAS * 8 + ["शकुनि","चतुष्पद","नाग"]
+
+# Sunday first (pandas dayofweek is Monday first)
+VARA_NAMES = ["रविवार","सोमवार","मंगलवार","बुधवार","गुरुवार","शुक्रवार","शनिवार"]
+
+PAKSHA = ["शुक्ल", "कृष्ण"]
+
+# anga -> (degrees per segment, segment names)
+ANGAS = {
+    "tithi": (12.0, TITHI_NAMES),
+    "karana": (6.0, KARANA_NAMES),
+    "nakshatra": (NAK_SIZE, NAKSHATRA_NAMES),
+    "yoga": (NAK_SIZE, YOGA_NAMES)
+}
+
+# Sun/Moon sample spacing (days); the shortest segment, a karana, lasts
+# at least ~9.5 h, so no boundary pair can fall between two samples
+PANCHANG_STEP = 0.25
+# Padding so the segments running at both ends of the span are whole
+PANCHANG_PAD = 2.0
+# Hermite inversion steps per boundary (cubic converges in 2-3)
+HERMITE_ITER = 3
+
+
+# ================= ANGA CURVES =================
+def anga_curves(lons, speed):
+    """
+    Sidereal Sun (col 0) / Moon (col 1) -> {anga: (angle, rate)} where
+    each angle grows monotonically and segments are fixed divisions of it.
+    """
+    sun, moon = lons[:, 0], lons[:, 1]
+    vs, vm = speed[:, 0], speed[:, 1]
+    elong = ((moon - sun) % 360, vm - vs)
+    return {
+        "tithi": elong,
+        "karana": elong,
+        "nakshatra": (moon, vm),
+        "yoga": ((sun + moon) % 360, vs + vm)
+    }
+
+
+def sun_moon(jds, ephe):
+    return ephe(jds, [SUN, MOON])
+
+
+def hermite_inverse(h, f0, f1, v0, v1, target):
+    """
+    Fraction s in [0, 1] of each sample interval where the cubic Hermite
+    through (f0, v0) and (f1, v1) reaches `target` (all arrays).
+    """
+    s = np.clip((target - f0) / (f1 - f0), 0.0, 1.0)
+    for _ in range(HERMITE_ITER):
+        s2, s3 = s * s, s * s * s
+        p = (2*s3 - 3*s2 + 1) * f0 + (s3 - 2*s2 + s) * h * v0 \
+            + (3*s2 - 2*s3) * f1 + (s3 - s2) * h * v1
+        dp = (6*s2 - 6*s) * f0 + (3*s2 - 4*s + 1) * h * v0 \
+            + (6*s - 6*s2) * f1 + (3*s2 - 2*s) * h * v1
+        s = np.clip(s - (p - target) / dp, 0.0, 1.0)
+    return s
+
+
+def anga_boundaries(jds, angle, rate, size):
+    """
+    (k, jd) of every crossing of k * size on the unwrapped angle, where
+    segment k runs from boundary k to boundary k + 1.
+    """
+    f = np.unwrap(angle, period=360)
+    k = np.arange(int(np.ceil(f[0] / size)), int(np.floor(f[-1] / size)) + 1)
+    target = k * size
+
+    i = np.clip(np.searchsorted(f, target) - 1, 0, len(f) - 2)
+    h = jds[1] - jds[0]
+    s = hermite_inverse(h, f[i], f[i + 1], rate[i], rate[i + 1], target)
+    return k, jds[i] + s * h
+
+
+# ================= SEGMENTS =================
+def panchang_segments(jd_start, jd_end, ephe=calc_grahas, step=PANCHANG_STEP):
+    """
+    Every tithi / karana / nakshatra / yoga segment overlapping
+    [jd_start, jd_end] as one table: anga, index (0-based within the
+    anga's cycle), name, start_jd, end_jd, sorted by anga then time.
+    """
+    n = int(np.ceil((jd_end - jd_start + 2 * PANCHANG_PAD) / step)) + 1
+    jds = jd_start - PANCHANG_PAD + np.arange(n) * step
+    curves = anga_curves(*sun_moon(jds, ephe))
+
+    found = {name: anga_boundaries(jds, *curves[name], ANGAS[name][0]) for name in ANGAS}
+
+    # one polishing Newton step for every boundary of every anga together
+    polish = np.concatenate([t for _, t in found.values()])
+    pc = anga_curves(*sun_moon(polish, ephe))
+    a = 0
+    for name, (k, t) in found.items():
+        size = ANGAS[name][0]
+        angle, rate = pc[name]
+        b = a + len(t)
+        t += wrap180(k * size - angle[a:b]) / rate[a:b]
+        a = b
+
+    parts = []
+    for name, (k, t) in found.items():
+        names = ANGAS[name][1]
+        keep = (t[1:] > jd_start) & (t[:-1] < jd_end)
+        index = k[:-1][keep] % len(names)
+        parts.append(pd.DataFrame({
+            "anga": name,
+            "index": index.astype(np.int16),
+            "name": np.asarray(names, dtype=object)[index],
+            "start_jd": t[:-1][keep],
+            "end_jd": t[1:][keep]
+        }))
+
+    df = pd.concat(parts, ignore_index=True)
+    df["anga"] = pd.Categorical(df["anga"], categories=list(ANGAS))
+    return df
+
+
+def with_times(df, tz=IST):
+    # local-time columns next to every *_jd column
+    out = df.copy()
+    for col in [c for c in df.columns if c.endswith("_jd")]:
+        out[col[:-3]] = jd_to_local(df[col].to_numpy(), tz)
+    return out
+
+
+def panchang_at(segments, jd):
+    """{anga: segment row} of the segments running at `jd`."""
+    out = {}
+    for name, part in segments.groupby("anga", observed=True):
+        i = np.searchsorted(part["start_jd"].to_numpy(), jd, side="right") - 1
+        if 0 <= i < len(part) and jd < part["end_jd"].iat[i]:
+            out[name] = part.iloc[i]
+    return out
+
+
+# ================= VEDIC DAYS =================
+def vedic_days(start_date, end_date, location, lat, lon, segments, rise_set=load_rise_set):
+    """
+    One row per civil date in [start_date, end_date]: vara, sunrise,
+    sunset, next sunrise, and the tithi / nakshatra / yoga / karana
+    prevailing at sunrise with the time each one ends. Sunrise and
+    sunset come from the cached per-year rise / set tables
+    (`rise_set(location, year, lat, lon)`), as in muhurta.sun_frames.
+    """
+    sunrise, sunset, next_sunrise, weekday = sun_frames(location, start_date, end_date,
+                                                        lat, lon, rise_set)
+    days = pd.DataFrame({
+        "date": pd.date_range(start_date, end_date, freq="D").date,
+        "vara": np.asarray(VARA_NAMES, dtype=object)[weekday],
+        "sunrise_jd": sunrise,
+        "sunset_jd": sunset,
+        "next_sunrise_jd": next_sunrise
+    })
+
+    for name, part in segments.groupby("anga", observed=True):
+        starts = part["start_jd"].to_numpy()
+        i = np.clip(np.searchsorted(starts, sunrise, side="right") - 1, 0, len(part) - 1)
+        days[name] = part["name"].to_numpy()[i]
+        days[f"{name}_end_jd"] = part["end_jd"].to_numpy()[i]
+        if name == "tithi":
+            days["paksha"] = np.asarray(PAKSHA, dtype=object)[part["index"].to_numpy()[i] // 15]
+
+    return days
+
+
+def panchang_calendar(start_date, end_date, location, lat, lon, ephe=calc_grahas, tz=IST,
+                      rise_set=load_rise_set):
+    """
+    (segments, days) for a location and a civil date range, both
+    columnar DataFrames; see panchang_segments and vedic_days.
+    """
+    jd_start = local_midnight_jd(start_date, tz)
+    jd_end = local_midnight_jd(end_date + datetime.timedelta(days=2), tz)
+    segments = panchang_segments(jd_start, jd_end, ephe)
+    return segments, vedic_days(start_date, end_date, location, lat, lon, segments, rise_set)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print a year of panchang for one district")
+    parser.add_argument("--district", default="Ujjain")
+    parser.add_argument("--year", type=int, default=datetime.date.today().year)
+    parser.add_argument("--out", help="write the day table to this CSV")
+    args = parser.parse_args()
+
+    swe.set_sid_mode(swe.SIDM_LAHIRI)
+    districts = load_districts()
+    row = districts[districts["District"].str.lower() == args.district.lower()].iloc[0]
+    label = f"{row['District']} – {row['State']}"
+
+    t0 = time.perf_counter()
+    segments, days = panchang_calendar(datetime.date(args.year, 1, 1),
+                                       datetime.date(args.year, 12, 31),
+                                       label, row["Latitude"], row["Longitude"])
+    elapsed = time.perf_counter() - t0
+
+    print(f"{row['District']}, {row['State']} {args.year}: {len(days)} days, "
+          f"{len(segments)} segments in {elapsed:.2f}s")
+    print(segments["anga"].value_counts(sort=False).to_string())
+    table = with_times(days).drop(columns=[c for c in days.columns if c.endswith("_jd")])
+    print(table.head(10).to_string(index=False))
+    if args.out:
+        table.to_csv(args.out, index=False)
@@ -0,0 +1,196 @@
+"""
+Process-pool execution of long scans and batch position jobs.
+
+    python parallel.py --years 20 --workers 4
+
+benchmarks every detector and a batch of chart positions serially and on
+the pool. Processes rather than threads so the scans use every CPU.
+Swiss Ephemeris keeps its sidereal mode and ephemeris path per thread;
+each worker process sets them once in its initializer (on the thread
+that then runs its jobs) and opens its own backend, so nothing but JD
+ranges and event dicts crosses process boundaries.
+"""
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import swisseph as swe
+
+from ephemeris import SID_MODE, to_jd_array
+from ephemeris_store import load_store
+from events import (
+    ASPECTS, CURSOR_TOL, aspect_table, event_jd, event_key, merge_events,
+    find_aspect_events, find_ingresses, find_lunations, find_stations
+)
+
+# Referenced by name so a job is just (name, jd range, kwargs)
+DETECTORS = {
+    "aspects": find_aspect_events,
+    "ingresses": find_ingresses,
+    "lunations": find_lunations,
+    "stations": find_stations
+}
+
+# One year keeps every chunk well above the longest sampling step
+# (60 days) while leaving enough chunks to balance a handful of workers
+CHUNK_DAYS = 365.25
+POSITION_CHUNK = 20_000
+
+# Backend of the current worker process, opened by init_worker
+WORKER_EPHE = None
+
+
+# ================= WORKERS =================
+def init_worker(sid_mode=SID_MODE, ephe_path=None):
+    global WORKER_EPHE
+    if ephe_path:
+        swe.set_ephe_path(ephe_path)
+    swe.set_sid_mode(sid_mode)
+    WORKER_EPHE = load_store()
+
+
+def worker_ephe():
+    # also usable in the parent, so serial runs share the same code path
+    global WORKER_EPHE
+    if WORKER_EPHE is None:
+        WORKER_EPHE = load_store()
+    return WORKER_EPHE
+
+
+def scan_chunk(job):
+    name, jd_start, jd_end, kwargs = job
+    return DETECTORS[name](jd_start, jd_end, ephe=worker_ephe(), **kwargs)
+
+
+def call_chunk(job):
+    func, jd_start, jd_end = job
+    return func(jd_start, jd_end, worker_ephe())
+
+
+def position_chunk(jds):
+    return worker_ephe()(jds)
+
+
+def make_pool(workers=None, sid_mode=SID_MODE, ephe_path=None):
+    return ProcessPoolExecutor(workers, initializer=init_worker,
+                               initargs=(sid_mode, ephe_path))
+
+
+def pool_map(func, jobs, workers=None, pool=None):
+    # an existing pool is reused (and left open); otherwise one is made
+    # for this call only
+    if pool is not None:
+        return list(pool.map(func, jobs))
+    with make_pool(workers) as pool:
+        return list(pool.map(func, jobs))
+
+
+# ================= CHUNKED SCANS =================
+def chunk_bounds(jd_start, jd_end, chunk_days=CHUNK_DAYS):
+    n = max(int(math.ceil((jd_end - jd_start) / chunk_days)), 1)
+    edges = np.linspace(jd_start, jd_end, n + 1)
+    return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+
+def parallel_scan(name, jd_start, jd_end, workers=None, chunk_days=CHUNK_DAYS,
+                  pool=None, **kwargs):
+    """
+    DETECTORS[name] over [jd_start, jd_end], one pool job per chunk.
+
+    Chunks share their edges and every detector treats its range as
+    closed, so an event on an edge comes back from both neighbours;
+    merge_events keeps it once. Aspect scans take a fixed window here
+    (no per-pair `cycles` horizons, which depend on the scan start).
+    """
+    jobs = [(name, a, b, kwargs) for a, b in chunk_bounds(jd_start, jd_end, chunk_days)]
+    return merge_events(*pool_map(scan_chunk, jobs, workers, pool))
+
+
+def parallel_chunks(func, jd_start, jd_end, workers=None, chunk_days=CHUNK_DAYS,
+                    pool=None):
+    """
+    func(a, b, ephe) for each chunk, results in chunk order. `func` must be
+    a module-level function so it can be pickled.
+    """
+    jobs = [(func, a, b) for a, b in chunk_bounds(jd_start, jd_end, chunk_days)]
+    return pool_map(call_chunk, jobs, workers, pool)
+
+
+# ================= BATCH POSITIONS =================
+def parallel_positions(times, workers=None, chunk=POSITION_CHUNK, pool=None):
+    """
+    get_positions_batch for a large batch of chart instants, split into
+    `chunk`-sized pieces across the pool. Returns (lons, retro, jds).
+    """
+    jds = to_jd_array(times)
+    parts = pool_map(position_chunk, np.array_split(jds, max(len(jds) // chunk, 1)),
+                     workers, pool)
+    lons = np.vstack([p[0] for p in parts])
+    speed = np.vstack([p[1] for p in parts])
+    return lons, speed < 0, jds
+
+
+# ================= BENCHMARK =================
+def benchmark(jd_start, jd_end, workers=None, n_charts=20_000, seed=0):
+    jobs = {
+        "aspects": {"table": aspect_table(tuple(ASPECTS), drishti=True)},
+        "ingresses": {"levels": ("sign", "nakshatra", "pada")},
+        "lunations": {},
+        "stations": {}
+    }
+    rng = np.random.default_rng(seed)
+    charts = rng.uniform(jd_start, jd_end, n_charts)
+
+    rows = []
+    with make_pool(workers) as pool:
+        # warm every worker (initializer + backend) before timing
+        pool_map(position_chunk, np.array_split(charts[:64], workers or os.cpu_count()),
+                 pool=pool)
+
+        for name, kwargs in jobs.items():
+            t0 = time.perf_counter()
+            serial = DETECTORS[name](jd_start, jd_end, ephe=worker_ephe(), **kwargs)
+            t_serial = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            par = parallel_scan(name, jd_start, jd_end, pool=pool, **kwargs)
+            t_par = time.perf_counter() - t0
+
+            same = len(serial) == len(par) and all(
+                event_key(e) == event_key(f) and abs(event_jd(e) - event_jd(f)) < CURSOR_TOL
+                for e, f in zip(serial, par))
+            rows.append((name, len(par), t_serial, t_par, same))
+
+        t0 = time.perf_counter()
+        serial = worker_ephe()(charts)
+        t_serial = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        lons, _, _ = parallel_positions(charts, pool=pool)
+        t_par = time.perf_counter() - t0
+
+        rows.append(("positions", n_charts, t_serial, t_par,
+                     bool(np.allclose(serial[0], lons))))
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the process-pool scans")
+    parser.add_argument("--start-year", type=int, default=2000)
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    swe.set_sid_mode(swe.SIDM_LAHIRI)
+    jd_start = swe.julday(args.start_year, 1, 1, 0)
+    jd_end = swe.julday(args.start_year + args.years, 1, 1, 0)
+
+    print(f"{args.workers} workers, {args.years} years")
+    for name, n, t_serial, t_par, same in benchmark(jd_start, jd_end, args.workers):
+        print(f"{name:10s} {n:8,} rows  serial {t_serial:7.2f}s  "
+              f"parallel {t_par:7.2f}s  x{t_serial / t_par:4.1f}  "
+              f"{'match' if same else 'MISMATCH'}")
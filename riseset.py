@@ -0,0 +1,272 @@
+"""
+Sun and Moon rise / set tables per location and year.
+
+    python riseset.py --district Ujjain --year 2026
+
+computes the year's sunrise, sunset, moonrise and moonset for one INDIALL
+district in a single pass and caches it under riseset/ (one Parquet file
+per district, year, coordinates and timezone), so reruns and restarts only index a row by day number. Times come back as
+timezone-aware datetimes (None when the body does not rise or set).
+
+    python riseset.py --all --date 2026-10-18 --time 07:00 --out india.csv
+    python riseset.py --all --year 2026
+
+compute every district at once on a process pool: rise / set plus the
+sidereal lagna at one instant, or the whole year's cached tables (the
+nightly precompute).
+"""
+import argparse
+import datetime
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+import pytz
+import swisseph as swe
+
+from ephemeris import (
+    JD_UNIX_EPOCH, SID_MODE, datetime_to_jd, jd_to_datetime, sidereal_houses
+)
+from parallel import pool_map
+
+RISESET_DIR = "riseset"
+IST = "Asia/Kolkata"
+
+# column -> (body, rise_trans flags); same flags as get_sun_moon_times
+RISE_EVENTS = {
+    "sunrise": (swe.SUN, swe.CALC_RISE | swe.BIT_DISC_CENTER),
+    "sunset": (swe.SUN, swe.CALC_SET | swe.BIT_DISC_CENTER),
+    "moonrise": (swe.MOON, swe.CALC_RISE),
+    "moonset": (swe.MOON, swe.CALC_SET)
+}
+
+
+# Districts per pool job in the all-district batches
+DISTRICT_CHUNK = 32
+
+
+# ================= COMPUTE =================
+def local_midnight_jd(date, tz=IST):
+    midnight = pd.Timestamp(datetime.datetime.combine(date, datetime.time())).tz_localize(tz)
+    return datetime_to_jd(midnight.to_pydatetime())
+
+
+def jd_to_local(jds, tz=IST):
+    seconds = (np.asarray(jds, dtype=np.float64) - JD_UNIX_EPOCH) * 86400
+    return pd.to_datetime(seconds, unit="s", utc=True).tz_convert(tz)
+
+
+def rise_trans_jd(jd, body, flags, lat, lon, rise_trans=swe.rise_trans):
+    # first event after `jd`, NaN when there is none (circumpolar)
+    res, t = rise_trans(jd, body, flags, (lon, lat, 0))
+    return t[0] if res == 0 else np.nan
+
+
+def rise_set_table(start_date, end_date, lat, lon, tz=IST, rise_trans=swe.rise_trans):
+    """
+    One row per civil date in [start_date, end_date] with the JD of the
+    first sunrise / sunset / moonrise / moonset after local midnight.
+    `rise_trans` lets callers route the calls (e.g. EphemerisService.call).
+    """
+    dates = pd.date_range(start_date, end_date, freq="D")
+    midnights = np.array([local_midnight_jd(d.date(), tz) for d in dates])
+
+    df = pd.DataFrame({"date": dates.date, "midnight_jd": midnights})
+    for col, (body, flags) in RISE_EVENTS.items():
+        df[f"{col}_jd"] = [rise_trans_jd(jd, body, flags, lat, lon, rise_trans)
+                           for jd in midnights]
+    return df
+
+
+# ================= CACHE =================
+def cache_path(district, year, lat, lon, tz=IST, cache_dir=RISESET_DIR):
+    # the label alone is not a key: the same name with other coordinates
+    # (to ~10 m) or another timezone gets its own file
+    slug = re.sub(r"[^\w]+", "_", district).strip("_")
+    zone = re.sub(r"[^\w]+", "_", tz)
+    return os.path.join(cache_dir, f"{slug}_{year}_{lat:.4f}_{lon:.4f}_{zone}.parquet")
+
+
+class RiseSetTable:
+    """
+    A rise_set_table as plain arrays; at(date) is an index by day number.
+    """
+
+    def __init__(self, df, tz=IST):
+        self.tz = pytz.timezone(tz)
+        self.first = df["date"].iat[0].toordinal()
+        self.jds = {col: df[f"{col}_jd"].to_numpy() for col in RISE_EVENTS}
+
+    def covers(self, date):
+        return 0 <= date.toordinal() - self.first < len(self.jds["sunrise"])
+
+    def row(self, date):
+        """{event: JD} for `date` (NaN where there is no event)."""
+        i = date.toordinal() - self.first
+        return {col: float(jds[i]) for col, jds in self.jds.items()}
+
+    def span(self, start_date, end_date):
+        """{event: JD array} for the dates in [start_date, end_date]."""
+        a, b = start_date.toordinal() - self.first, end_date.toordinal() - self.first + 1
+        return {col: jds[a:b] for col, jds in self.jds.items()}
+
+    def at(self, date):
+        """{event: aware datetime or None} for `date`."""
+        return {col: None if np.isnan(jd) else jd_to_datetime(jd).astimezone(self.tz)
+                for col, jd in self.row(date).items()}
+
+
+def load_rise_set(district, year, lat, lon, cache_dir=RISESET_DIR, tz=IST,
+                  rise_trans=swe.rise_trans):
+    """
+    RiseSetTable for (district, year), computed once and then read from
+    `cache_dir`. `district` is a readable label for the location (the
+    apps use "District – State"); the file is keyed by it together with
+    lat, lon and tz.
+    """
+    path = cache_path(district, year, lat, lon, tz, cache_dir)
+    if os.path.exists(path):
+        return RiseSetTable(pd.read_parquet(path), tz)
+
+    df = rise_set_table(datetime.date(year, 1, 1), datetime.date(year, 12, 31),
+                        lat, lon, tz, rise_trans)
+    os.makedirs(cache_dir, exist_ok=True)
+    df.to_parquet(path, index=False)
+    return RiseSetTable(df, tz)
+
+
+# ================= ALL DISTRICTS =================
+def lagna(jd, lat, lon, sid_mode=SID_MODE):
+    # sidereal ascendant; the mode is set here because it is per thread
+    ascmc, _ = sidereal_houses(jd, lat, lon, b'P', sid_mode)
+    return ascmc[0] % 360
+
+
+def district_lagnas(jd, districts, sid_mode=SID_MODE):
+    # lagna at `jd` for every row of `districts`, in row order
+    places = districts[["Latitude", "Longitude"]].to_numpy()
+    return np.array([lagna(jd, lat, lon, sid_mode) for lat, lon in places])
+
+
+def district_rows(job):
+    date, jd, places, tz = job
+    midnight = local_midnight_jd(date, tz)
+    rows = []
+    for lat, lon in places:
+        row = {f"{col}_jd": rise_trans_jd(midnight, body, flags, lat, lon)
+               for col, (body, flags) in RISE_EVENTS.items()}
+        if jd is not None:
+            row["lagna"] = lagna(jd, lat, lon)
+        rows.append(row)
+    return rows
+
+
+def district_year(job):
+    label, year, lat, lon, cache_dir, tz = job
+    load_rise_set(label, year, lat, lon, cache_dir, tz)
+    return cache_path(label, year, lat, lon, tz, cache_dir)
+
+
+def district_jobs(districts, make_job):
+    places = districts[["Latitude", "Longitude"]].to_numpy().tolist()
+    return [make_job(places[a:a + DISTRICT_CHUNK])
+            for a in range(0, len(places), DISTRICT_CHUNK)]
+
+
+def all_districts(date, dt_utc=None, districts=None, workers=None, tz=IST, pool=None):
+    """
+    Sunrise, sunset, moonrise and moonset on `date` for every INDIALL
+    district, plus the sidereal lagna at `dt_utc` when given, as one
+    DataFrame (District, State, Latitude, Longitude, times, lagna,
+    lagna_sign). workers=1 runs in this process; otherwise chunks of
+    districts go to `pool` or a parallel.make_pool pool made for the call.
+    """
+    districts = load_districts() if districts is None else districts
+    jd = None if dt_utc is None else datetime_to_jd(dt_utc)
+    jobs = district_jobs(districts, lambda places: (date, jd, places, tz))
+
+    if workers == 1 and pool is None:
+        parts = [district_rows(job) for job in jobs]
+    else:
+        parts = pool_map(district_rows, jobs, workers, pool)
+
+    found = pd.DataFrame([row for part in parts for row in part])
+    df = districts[["District", "State", "Latitude", "Longitude"]].reset_index(drop=True)
+    for col in RISE_EVENTS:
+        df[col] = jd_to_local(found[f"{col}_jd"].to_numpy(), tz)
+    if jd is not None:
+        df["lagna"] = found["lagna"]
+        df["lagna_sign"] = (found["lagna"] // 30).astype(np.int8)
+    return df
+
+
+def build_all_years(year, districts=None, workers=None, cache_dir=RISESET_DIR, tz=IST):
+    """Fill the on-disk cache for every district's `year`; returns the paths."""
+    districts = load_districts() if districts is None else districts
+    jobs = [(f"{r.District} – {r.State}", year, r.Latitude, r.Longitude, cache_dir, tz)
+            for r in districts.itertuples(index=False)]
+    return pool_map(district_year, jobs, workers)
+
+
+def load_districts():
+    # same INDIALL sources as the apps' location picker
+    for path, read in (("INDIALL.parquet", pd.read_parquet),
+                       ("INDIALL.json", pd.read_json),
+                       ("INDIALL.csv", pd.read_csv)):
+        if os.path.exists(path):
+            df = read(path)
+            df.columns = df.columns.str.strip()
+            return df
+    raise FileNotFoundError("INDIALL.parquet / .json / .csv not found")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build district rise / set tables")
+    parser.add_argument("--district", default="Ujjain")
+    parser.add_argument("--year", type=int, default=datetime.date.today().year)
+    parser.add_argument("--cache-dir", default=RISESET_DIR)
+    parser.add_argument("--all", action="store_true", help="every INDIALL district")
+    parser.add_argument("--date", help="with --all: one date (YYYY-MM-DD) instead of a year")
+    parser.add_argument("--time", default="06:00", help="with --date: IST time for the lagna")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", help="with --date: write the table to this CSV")
+    args = parser.parse_args()
+
+    districts = load_districts()
+
+    if args.all and args.date:
+        date = datetime.date.fromisoformat(args.date)
+        dt = pytz.timezone(IST).localize(datetime.datetime.combine(
+            date, datetime.time.fromisoformat(args.time)))
+
+        t0 = time.perf_counter()
+        df = all_districts(date, dt.astimezone(pytz.utc), districts, args.workers)
+        print(f"{len(df)} districts on {args.workers} workers: "
+              f"{time.perf_counter() - t0:.2f}s")
+        print(df.head(10).to_string(index=False))
+        if args.out:
+            df.to_csv(args.out, index=False)
+
+    elif args.all:
+        t0 = time.perf_counter()
+        paths = build_all_years(args.year, districts, args.workers, args.cache_dir)
+        print(f"{len(paths)} district tables for {args.year} on {args.workers} workers: "
+              f"{time.perf_counter() - t0:.1f}s -> {args.cache_dir}/")
+
+    else:
+        row = districts[districts["District"].str.lower() == args.district.lower()].iloc[0]
+        label = f"{row['District']} – {row['State']}"
+        lat, lon = row["Latitude"], row["Longitude"]
+
+        t0 = time.perf_counter()
+        table = load_rise_set(label, args.year, lat, lon, args.cache_dir)
+        print(f"{label} {args.year}: {time.perf_counter() - t0:.2f}s "
+              f"-> {cache_path(label, args.year, lat, lon, cache_dir=args.cache_dir)}")
+
+        t0 = time.perf_counter()
+        today = table.at(datetime.date(args.year, 1, 1))
+        print(f"lookup: {(time.perf_counter() - t0) * 1e6:.0f} µs")
+        for col, t in today.items():
+            print(f"{col:9s} {t:%Y-%m-%d %H:%M:%S}" if t else f"{col:9s} —")
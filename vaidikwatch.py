@@ -20,6 +20,17 @@ from collections import defaultdict
 import hashlib
 from streamlit_autorefresh import st_autorefresh
 import base64
+from ephemeris import get_positions, calc_grahas, datetime_to_jd, GRAHA_NAMES, PositionCache, SID_MODE, sidereal_houses
+from ephemeris_service import EphemerisService
+from ephemeris_grid import load_grid
+from ephemeris_store import load_store
+from event_index import load_index
+from events import (
+    ASPECTS, DEFAULT_ASPECTS, HORIZON_CYCLES, aspect_table, aspect_kernel,
+    find_aspect_events, find_lunations, find_ingresses, find_stations,
+    iter_aspect_events, iter_ingresses, iter_lunations, iter_stations, next_events,
+    scan_all, indexed, RetroTimeline, WindowCache, LUNATIONS
+)
 
 
 
@@ -327,8 +338,53 @@ with st.sidebar:
         unsafe_allow_html=True
     )
 
-FLAGS = swe.FLG_SWIEPH | swe.FLG_SIDEREAL
-swe.set_sid_mode(swe.SIDM_LAHIRI)
+
+# Memory-mapped store (ephemeris_store.py), then Chebyshev grid
+# (ephemeris_grid.py), then live Swiss Ephemeris; the store is mapped
+# read-only so every worker process shares one copy in the page cache.
+# Live Swiss Ephemeris calls go through one process-wide LRU cache,
+# shared by every session, so its JD quantum is a startup setting
+# (POSITION_QUANTUM_SECONDS, default 1 s) rather than a per-visitor control.
+POSITION_QUANTUM = float(os.environ.get("POSITION_QUANTUM_SECONDS", 1.0))
+
+@st.cache_resource(show_spinner=False)
+def load_position_cache():
+    return PositionCache(quantum_seconds=POSITION_QUANTUM)
+
+POSITION_CACHE = load_position_cache()
+
+# swisseph settings (Lahiri) are per thread, so they belong to one
+# service thread that every session's live calls are queued to, instead
+# of a module-level set_sid_mode on whichever thread runs the script.
+@st.cache_resource(show_spinner=False)
+def load_ephemeris_service():
+    return EphemerisService(SID_MODE, source=POSITION_CACHE.calc_grahas)
+
+SWE = load_ephemeris_service()
+
+@st.cache_resource(show_spinner=False)
+def load_ephemeris_backend():
+    return load_store(fallback=load_grid(fallback=SWE))
+
+EPHE = load_ephemeris_backend()
+
+# Precomputed events (event_index.py); the panels fall back to live
+# scans outside its span or when it has not been built.
+@st.cache_resource(show_spinner=False)
+def load_event_index():
+    return load_index()
+
+EVENT_INDEX = load_event_index()
+
+# Retrograde intervals around the selected year, built once per year and
+# shared by the chart's वक्री flags and the stations panel.
+@st.cache_resource(show_spinner=False)
+def load_retro_timeline(year):
+    jd_start, jd_end = swe.julday(year - 1, 1, 1, 0), swe.julday(year + 11, 1, 1, 0)
+    stations = None
+    if EVENT_INDEX is not None and EVENT_INDEX.covers(jd_start, jd_end):
+        stations = EVENT_INDEX.stations(jd_start, jd_end)
+    return RetroTimeline(jd_start, jd_end, EPHE, stations)
 
 # ================= SESSION DEFAULTS =================
 if "sel_date" not in st.session_state:
@@ -373,24 +429,6 @@ def nakshatra_pada(lon):
     pada = int((lon % nak_size) // pada_size) + 1
     return NAKSHATRAS[idx][0], NAKSHATRAS[idx][1], pada
 
-def get_positions(dt_utc):
-    jd = swe.julday(dt_utc.year, dt_utc.month, dt_utc.day,
-                    dt_utc.hour + dt_utc.minute/60)
-
-    pos, retro = {}, {}
-    ay = swe.get_ayanamsa_ut(jd)
-
-    for name, code, sym in PLANETS:
-        r, _ = swe.calc_ut(jd, code)
-        lon = (r[0] - ay) % 360
-        pos[name] = lon
-        retro[name] = r[3] < 0
-
-    pos["केतु"] = (pos["राहु"] + 180) % 360
-    retro["केतु"] = retro["राहु"]
-
-    return pos, retro, jd
-
 def generate_svg(pos, retro):
     from collections import defaultdict
 
@@ -517,9 +555,11 @@ ist = pytz.timezone("Asia/Kolkata")
 dt_ist = ist.localize(datetime.datetime.combine(date, time))
 dt_utc = dt_ist.astimezone(pytz.utc)
 
-pos, retro, jd = get_positions(dt_utc)
+pos, _, jd = get_positions(dt_utc, EPHE)
+RETRO = load_retro_timeline(dt_utc.year)
+retro = RETRO.retro_at(jd)
 
-ascmc, _ = swe.houses_ex(jd, LAT, LON, b'P', FLAGS)
+ascmc, _ = SWE.call(sidereal_houses, jd, LAT, LON, b'P', SWE.sid_mode)
 lagna_deg = ascmc[0] % 360
 lagna_sign = SIGNS[int(lagna_deg // 30)]
 
@@ -576,75 +616,17 @@ ZODIACS = [
     "Libra","Scorpio","Sagittarius","Capricorn","Aquarius","Pisces"
 ]
 
-def angular_diff(a, b):
-    d = abs(a - b) % 360
-    return min(d, 360 - d)
+def upcoming_aspects(start_dt_utc, days=5, table=None, cycles=None, index=None,
+                     window=None, ephe=calc_grahas):
+    jd = datetime_to_jd(start_dt_utc)
+    detect = indexed(index,
+                     lambda a, b: index.aspects(a, b, table, cycles),
+                     lambda a, b: find_aspect_events(a, b, table, ephe, cycles))
 
-ASPECTS = {
-    "Conjunction": {z: z for z in ZODIACS},
-    "Opposition": {
-        "Aries": "Libra",
-        "Taurus": "Scorpio",
-        "Gemini": "Sagittarius",
-        "Cancer": "Capricorn",
-        "Leo": "Aquarius",
-        "Virgo": "Pisces",
-        "Libra": "Aries",
-        "Scorpio": "Taurus",
-        "Sagittarius": "Gemini",
-        "Capricorn": "Cancer",
-        "Aquarius": "Leo",
-        "Pisces": "Virgo"
-    }
-}
-
-def upcoming_aspects(start_dt_utc, days=5, step_minutes=30):
-    events = []
-    seen = set()
-
-    total_steps = int((days * 24 * 60) / step_minutes)
-    prev_pos = None
-
-    for step in range(total_steps):
-        dt = start_dt_utc + datetime.timedelta(minutes=step * step_minutes)
-        pos, _, _ = get_positions(dt)
-
-        if prev_pos is None:
-            prev_pos = pos
-            continue
-
-        planets = list(pos.keys())
-
-        for i in range(len(planets)):
-            for j in range(i + 1, len(planets)):
-                p1, p2 = planets[i], planets[j]
-
-                prev_diff = angular_diff(prev_pos[p1], prev_pos[p2])
-                curr_diff = angular_diff(pos[p1], pos[p2])
-
-                if prev_diff > 1 and curr_diff <= 1:
-                    key = (p1, p2, "Conjunction")
-                    if key not in seen:
-                        seen.add(key)
-                        events.append({
-                            "aspect": "Conjunction",
-                            "planets": f"{p1} ☌ {p2}",
-                            "time": dt
-                        })
-
-                if prev_diff < 179 and curr_diff >= 179:
-                    key = (p1, p2, "Opposition")
-                    if key not in seen:
-                        seen.add(key)
-                        events.append({
-                            "aspect": "Opposition",
-                            "planets": f"{p1} ☍ {p2}",
-                            "time": dt
-                        })
-
-        prev_pos = pos
-
-    return events
+    # per-pair horizons move with the start, so they are not windowable
+    if window is None or cycles is not None:
+        return detect(jd, jd + days)
+    return window.query(detect, jd, jd + days)
 
 def unique_events(events):
     seen = set()
@@ -661,86 +643,79 @@ def unique_events(events):
 def zodiac_sign(deg):
     return ZODIACS[int(deg // 30)]
 
-def detect_aspects(pos):
+def detect_aspects(pos, names=DEFAULT_ASPECTS, drishti=False, mode="sign"):
+    table = aspect_table(names, drishti)
+    _, active, _ = aspect_kernel([[pos[p] for p in GRAHA_NAMES]], table, mode)
+
     events = []
+    for s in active[0].nonzero()[0]:
+        p1, p2 = GRAHA_NAMES[table["i"][s]], GRAHA_NAMES[table["j"][s]]
+        s1, s2 = zodiac_sign(pos[p1]), zodiac_sign(pos[p2])
+        name, symbol = table["name"][s], table["symbol"][s]
 
-    planets = list(pos.keys())
+        if name == "Conjunction":
+            events.append(f"{p1} {symbol} {p2} (Conjunction in {s1})")
+        else:
+            events.append(f"{p1} {symbol} {p2} ({name} {s1}–{s2})")
 
-    for i in range(len(planets)):
-        for j in range(i + 1, len(planets)):
-            p1, p2 = planets[i], planets[j]
-            s1 = zodiac_sign(pos[p1])
-            s2 = zodiac_sign(pos[p2])
+    return events
 
-            if s1 == s2:
-                events.append(f"{p1} ☌ {p2} (Conjunction in {s1})")
-            elif ASPECTS["Opposition"].get(s1) == s2:
-                events.append(f"{p1} ☍ {p2} (Opposition {s1}–{s2})")
+def detect_amavasya_purnima(start_dt_utc, days=30, index=None, window=None, ephe=calc_grahas):
+    jd = datetime_to_jd(start_dt_utc)
+    detect = indexed(index,
+                     lambda a, b: index.lunations(a, b),
+                     lambda a, b: find_lunations(a, b, ephe))
 
-    return events
+    if window is None:
+        return detect(jd, jd + days)
+    return window.query(detect, jd, jd + days)
 
-def moon_sun_diff(moon_deg, sun_deg):
-    diff = (moon_deg - sun_deg) % 360
-    return min(diff, 360 - diff)
+def upcoming_stations(start_dt_utc, days=30, timeline=None, index=None, ephe=calc_grahas):
+    jd = datetime_to_jd(start_dt_utc)
+    if timeline is not None and timeline.covers(jd) and timeline.covers(jd + days):
+        return timeline.between(jd, jd + days)
+    if index is not None and index.covers(jd, jd + days):
+        return index.stations(jd, jd + days)
+    return find_stations(jd, jd + days, ephe=ephe)
 
-def detect_amavasya_purnima(start_dt_utc, days=30, step_minutes=15):
-    events = {
-        "Amavasya": {"start": None, "end": None},
-        "Purnima": {"start": None, "end": None}
-    }
+NAK_SIZE = 13 + 1/3
 
-    total_steps = int((days * 24 * 60) / step_minutes)
-
-    prev_diff = None
-
-    for step in range(total_steps):
-        dt = start_dt_utc + datetime.timedelta(minutes=step * step_minutes)
-        pos, _, _ = get_positions(dt)
-
-        moon = pos["चन्द्र"]
-        sun = pos["सूर्य"]
-        diff = moon_sun_diff(moon, sun)
-
-        if (
-            prev_diff is not None
-            and prev_diff > 12
-            and diff <= 12
-            and events["Amavasya"]["start"] is None
-        ):
-            events["Amavasya"]["start"] = dt
-
-        if (
-            events["Amavasya"]["start"]
-            and prev_diff is not None
-            and prev_diff > 0.5
-            and diff <= 0.5
-            and events["Amavasya"]["end"] is None
-        ):
-            events["Amavasya"]["end"] = dt
-
-        if (
-            prev_diff is not None
-            and prev_diff < 168
-            and diff >= 168
-            and events["Purnima"]["start"] is None
-        ):
-            events["Purnima"]["start"] = dt
-
-        if (
-            events["Purnima"]["start"]
-            and prev_diff is not None
-            and prev_diff < 179.5
-            and diff >= 179.5
-            and events["Purnima"]["end"] is None
-        ):
-            events["Purnima"]["end"] = dt
-
-        prev_diff = diff
-
-        if all(v["end"] for v in events.values()):
-            break
+def zodiac_index(deg):
+    return int(deg // 30)
 
-    return events
+def nakshatra_index(deg):
+    return int(deg // NAK_SIZE)
+
+def zodiac_name(deg):
+    return SIGNS[zodiac_index(deg)]
+
+def nakshatra_name(deg):
+    return NAKSHATRAS[nakshatra_index(deg)][0]
+
+FAST_PLANETS = ["चन्द्र", "बुध", "शुक्र", "सूर्य"]
+
+def ingress_cell_name(level, idx):
+    if level == "sign":
+        return SIGNS[idx]
+    if level == "nakshatra":
+        return NAKSHATRAS[idx][0]
+    return f"{NAKSHATRAS[idx // 4][0]} (पद {idx % 4 + 1})"
+
+def upcoming_sign_nakshatra_changes(start_dt_utc, days=10, planets=FAST_PLANETS,
+                                    levels=("sign", "nakshatra"), index=None,
+                                    window=None, ephe=calc_grahas):
+    jd = datetime_to_jd(start_dt_utc)
+    detect = indexed(index,
+                     lambda a, b: index.ingresses(a, b, planets, levels),
+                     lambda a, b: find_ingresses(a, b, planets, levels, ephe))
+
+    events = detect(jd, jd + days) if window is None else window.query(detect, jd, jd + days)
+
+    # copies, so events held by a WindowCache keep their cell indices
+    return [dict(e, **{
+        "from": ingress_cell_name(e["level"], e["from"]),
+        "to": ingress_cell_name(e["level"], e["to"])
+    }) for e in events]
 
 ASPECT_STYLE = {
     "Conjunction": {
@@ -750,48 +725,126 @@ ASPECT_STYLE = {
     "Opposition": {
         "icon": "🔴",
         "color": "#e74c3c"
+    },
+    "Trine": {
+        "icon": "🔵",
+        "color": "#3498db"
+    },
+    "Square": {
+        "icon": "🟠",
+        "color": "#e67e22"
+    },
+    "Sextile": {
+        "icon": "🟣",
+        "color": "#9b59b6"
+    },
+    "Drishti": {
+        "icon": "🟡",
+        "color": "#f1c40f"
     }
 }
 
+# ================= TIME-WINDOW SCANS =================
+# One shared sample stream feeds every panel below, so each instant is
+# computed once per rerun.
+sc1, sc2, sc3 = st.columns([1, 2, 1])
+aspect_days = sc1.selectbox(
+    "युति / प्रतियुति अवधि (दिन)",
+    [10, 30, 90, 365, 365*5],
+    index=0
+)
+aspect_auto = sc1.checkbox(
+    "प्रति-युग्म अवधि (Auto horizon)",
+    value=False,
+    help="Each pair is scanned for one full synodic cycle (capped at the period above): "
+         "about a month for Moon pairs, up to decades for गुरु–शनि."
+)
+transit_planets = sc2.multiselect("ग्रह", GRAHA_NAMES, default=FAST_PLANETS)
+transit_days = sc3.selectbox("गोचर अवधि (दिन)", [10, 30, 90, 365, 365*5], index=0)
+
+ac1, ac2 = st.columns([3, 1])
+aspect_names = ac1.multiselect("दृष्टि (Aspects)", list(ASPECTS), default=list(DEFAULT_ASPECTS))
+aspect_drishti = ac2.checkbox("विशेष दृष्टि (मंगल / गुरु / शनि)", value=False)
+aspect_set = aspect_table(aspect_names, drishti=aspect_drishti)
+
+# Each scan keeps its last window per session; nudging the time only
+# scans the newly exposed edge. A settings change starts a fresh window.
+def session_window(name, *config):
+    windows = st.session_state.setdefault("scan_windows", {})
+    if name not in windows or windows[name][0] != config:
+        windows[name] = (config, WindowCache())
+    return windows[name][1]
+
+scan_windows = {
+    "lunations": session_window("lunations"),
+    "aspects": session_window("aspects", tuple(aspect_names), aspect_drishti, aspect_auto),
+    "ingresses": session_window("ingresses", tuple(transit_planets))
+}
+
+scan_results, scan_timings = scan_all({
+    "lunations": lambda ephe: detect_amavasya_purnima(
+        dt_utc, days=30, index=EVENT_INDEX, window=scan_windows["lunations"], ephe=ephe
+    ),
+    "aspects": lambda ephe: upcoming_aspects(
+        dt_utc, days=aspect_days, table=aspect_set,
+        cycles=HORIZON_CYCLES if aspect_auto else None, index=EVENT_INDEX,
+        window=scan_windows["aspects"], ephe=ephe
+    ),
+    "ingresses": lambda ephe: upcoming_sign_nakshatra_changes(
+        dt_utc, days=transit_days, planets=transit_planets, index=EVENT_INDEX,
+        window=scan_windows["ingresses"], ephe=ephe
+    )
+}, ephe=EPHE)
+
+for name, window in scan_windows.items():
+    scan_timings[name]["scanned days"] = window.scanned
+
+# read off the cached retrograde timeline, no scan needed
+station_events = upcoming_stations(dt_utc, days=transit_days, timeline=RETRO,
+                                   index=EVENT_INDEX, ephe=EPHE)
+
+with st.expander("⏱️ स्कैन समय (Scan timing)"):
+    st.dataframe(pd.DataFrame(scan_timings).T.round(1), use_container_width=True)
+
+with st.expander("🧮 Position cache"):
+    # read-only: the cache is shared by all sessions
+    st.dataframe(
+        pd.DataFrame([POSITION_CACHE.stats()]).T.rename(columns={0: "value"}),
+        use_container_width=True
+    )
+
 st.subheader("🌙 Amavasya & Purnima (Upcoming)")
 
-events = detect_amavasya_purnima(dt_utc, days=30)
+events = scan_results["lunations"]
 
 ist = pytz.timezone("Asia/Kolkata")
 
-for name, data in events.items():
-    if data["start"] and data["end"]:
-        start_ist = data["start"].astimezone(ist)
-        end_ist = data["end"].astimezone(ist)
+for e in events:
+    start_ist = e["start"].astimezone(ist)
+    end_ist = e["end"].astimezone(ist)
 
-        st.markdown(
-            f"""
-            **{name}**
-            - 🟢 Start : {start_ist.strftime('%d-%b-%Y %H:%M IST')}
-            - 🔴 End   : {end_ist.strftime('%d-%b-%Y %H:%M IST')}
-            """
-        )
-    else:
+    st.markdown(
+        f"""
+        **{e["name"]}**
+        - 🟢 Start : {start_ist.strftime('%d-%b-%Y %H:%M IST')}
+        - 🔴 End   : {end_ist.strftime('%d-%b-%Y %H:%M IST')}
+        """
+    )
+
+for name in LUNATIONS:
+    if not any(e["name"] == name for e in events):
         st.caption(f"{name} not found in the next 30 days.")
 
-st.subheader("🔭 Upcoming Conjunctions & Oppositions (Next 10 Days)")
+aspect_span = "per-pair horizon" if aspect_auto else f"{aspect_days} days"
+st.subheader(f"🔭 Upcoming Aspects (Next {aspect_span})")
 
-events = upcoming_aspects(
-    start_dt_utc=dt_utc,
-    days=10,
-    step_minutes=30
-)
+events = scan_results["aspects"]
 
 ist = pytz.timezone("Asia/Kolkata")
 now_ist = datetime.datetime.now(ist)
 
-ASPECT_STYLE = {
-    "Conjunction": {"icon": "🟢", "color": "#2ecc71"},
-    "Opposition": {"icon": "🔴", "color": "#e74c3c"}
-}
-
 if not events:
-    st.caption("No major conjunctions or oppositions in the next 10 days.")
+    st.caption(f"No selected aspects in the next {aspect_span}.")
 else:
     grouped = defaultdict(list)
     for e in events:
@@ -816,7 +869,7 @@ else:
         """
 
         for e, t in grouped[event_date]:
-            style = ASPECT_STYLE[e["aspect"]]
+            style = ASPECT_STYLE.get(e["aspect"], ASPECT_STYLE["Drishti"])
             delta = t - now_ist
             hours_left = delta.total_seconds() / 3600
 
@@ -863,78 +916,21 @@ else:
 
     st.components.v1.html(html, height=520, scrolling=True)
 
-NAK_SIZE = 13 + 1/3
-
-def zodiac_index(deg):
-    return int(deg // 30)
-
-def nakshatra_index(deg):
-    return int(deg // NAK_SIZE)
-
-def zodiac_name(deg):
-    return SIGNS[zodiac_index(deg)]
-
-def nakshatra_name(deg):
-    return NAKSHATRAS[nakshatra_index(deg)][0]
-
-def upcoming_sign_nakshatra_changes(start_dt_utc, days=10, step_minutes=30):
-    events = []
-
-    FAST_PLANETS = ["चन्द्र", "बुध", "शुक्र", "सूर्य"]
-
-    total_steps = int((days * 24 * 60) / step_minutes)
-    prev_pos = None
+with st.expander("👁️ अभी की दृष्टि (Aspects at selected time)"):
+    aspect_mode = st.radio("Mode", ["sign", "degree"], horizontal=True,
+                           help="sign: whole-sign (Vedic); degree: within each aspect's orb")
+    current = detect_aspects(pos, aspect_names, aspect_drishti, aspect_mode)
+    st.write("\n".join(f"- {a}" for a in current) if current else "—")
 
-    for step in range(total_steps):
-        dt = start_dt_utc + datetime.timedelta(minutes=step * step_minutes)
-        pos, _, _ = get_positions(dt)
+st.subheader(f"🪐 Planetary Transitions (Next {transit_days} Days)")
 
-        if prev_pos is None:
-            prev_pos = pos
-            continue
-
-        for planet in FAST_PLANETS:
-            prev_sign = zodiac_name(prev_pos[planet])
-            curr_sign = zodiac_name(pos[planet])
-
-            if prev_sign != curr_sign:
-                events.append({
-                    "type": "Zodiac Change",
-                    "planet": planet,
-                    "from": prev_sign,
-                    "to": curr_sign,
-                    "time": dt
-                })
-
-            prev_nak = nakshatra_name(prev_pos[planet])
-            curr_nak = nakshatra_name(pos[planet])
-
-            if prev_nak != curr_nak:
-                events.append({
-                    "type": "Nakshatra Change",
-                    "planet": planet,
-                    "from": prev_nak,
-                    "to": curr_nak,
-                    "time": dt
-                })
-
-        prev_pos = pos
-
-    return events
-
-st.subheader("🪐 Planetary Transitions (Next 10 Days)")
-
-events = upcoming_sign_nakshatra_changes(
-    start_dt_utc=dt_utc,
-    days=10,
-    step_minutes=30
-)
+events = scan_results["ingresses"]
 
 ist = pytz.timezone("Asia/Kolkata")
 now_ist = datetime.datetime.now(ist)
 
 if not events:
-    st.caption("No planetary sign or nakshatra changes in the next 10 days.")
+    st.caption(f"No planetary sign or nakshatra changes in the next {transit_days} days.")
 else:
     grouped = defaultdict(list)
     for e in events:
@@ -984,6 +980,83 @@ else:
 
     st.components.v1.html(html, height=520, scrolling=True)
 
+st.subheader(f"⏸️ Retrograde Stations (Next {transit_days} Days)")
+
+events = station_events
+
+if not events:
+    st.caption(f"No retrograde or direct stations in the next {transit_days} days.")
+else:
+    rows = []
+
+    for e in events:
+        t_ist = e["time"].astimezone(ist)
+        rows.append([
+            t_ist.strftime("%d-%b-%Y"),
+            t_ist.strftime("%H:%M"),
+            e["planet"],
+            e["type"]
+        ])
+
+    st.dataframe(
+        pd.DataFrame(rows, columns=["Date", "Time (IST)", "Planet", "Station"]),
+        use_container_width=True,
+        hide_index=True
+    )
+
+# ================= EVENT STREAM =================
+# Open-ended, merged feed of every event kind; each "load more" resumes
+# the streams from their cursors and computes only the next page.
+EVENT_PAGE = 20
+
+st.subheader("🔮 आगामी घटनाएँ (Event stream)")
+
+stream_start = datetime_to_jd(dt_utc)
+event_streams = {
+    "aspect": lambda c: iter_aspect_events(c, aspect_set, EPHE, EVENT_INDEX),
+    "ingress": lambda c: iter_ingresses(c, transit_planets, ephe=EPHE, index=EVENT_INDEX),
+    "lunation": lambda c: iter_lunations(c, EPHE, EVENT_INDEX),
+    "station": lambda c: iter_stations(c, ephe=EPHE, index=EVENT_INDEX)
+}
+stream_id = (stream_start, tuple(aspect_names), aspect_drishti, tuple(transit_planets))
+
+def load_more_events():
+    page, st.session_state.stream_cursors = next_events(
+        event_streams, st.session_state.stream_cursors, EVENT_PAGE
+    )
+    st.session_state.stream_events += page
+
+if st.session_state.get("stream_id") != stream_id:
+    st.session_state.stream_id = stream_id
+    st.session_state.stream_events = []
+    st.session_state.stream_cursors = {kind: stream_start for kind in event_streams}
+    load_more_events()
+
+rows = []
+for kind, e in st.session_state.stream_events:
+    t_ist = (e["time"] if "time" in e else e["end"]).astimezone(ist)
+
+    if kind == "aspect":
+        label, detail = e["aspect"], e["planets"]
+    elif kind == "ingress":
+        label = e["type"]
+        detail = f'{e["planet"]}: {ingress_cell_name(e["level"], e["from"])} → ' \
+                 f'{ingress_cell_name(e["level"], e["to"])}'
+    elif kind == "lunation":
+        label = e["name"]
+        detail = f'Start {e["start"].astimezone(ist).strftime("%d-%b %H:%M")}'
+    else:
+        label, detail = e["type"], e["planet"]
+
+    rows.append([t_ist.strftime("%d-%b-%Y"), t_ist.strftime("%H:%M"), label, detail])
+
+st.dataframe(
+    pd.DataFrame(rows, columns=["Date", "Time (IST)", "Event", "Details"]),
+    use_container_width=True,
+    hide_index=True
+)
+st.button("और दिखाएँ (Load more)", on_click=load_more_events)
+
 RASHI_NUM = {
     "मेष": 1, "वृषभ": 2, "मिथुन": 3, "कर्क": 4,
     "सिंह": 5, "कन्या": 6, "तुला": 7, "वृश्चिक": 8,
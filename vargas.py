@@ -0,0 +1,203 @@
+"""
+Divisional (varga) charts D1 - D60 as one integer matrix.
+
+    python vargas.py --district Ujjain --date 2026-10-18 --time 07:00
+    python vargas.py --days 30 --varga 9
+
+Every Parashari varga maps (sign, part of the sign) to a sign, so each is
+a small lookup table. The tables are stacked and every varga of every
+longitude (grahas, lagna, many charts or time samples) is one gather;
+sampled over time, the changes of a column give the varga ingresses.
+"""
+import argparse
+import datetime
+import time
+
+import numpy as np
+import pandas as pd
+
+from ephemeris import GRAHA_NAMES, calc_grahas, datetime_to_jd
+
+# Division -> name, D1 to D60
+VARGAS = {
+    1: "राशि", 2: "होरा", 3: "द्रेष्काण", 4: "चतुर्थांश", 7: "सप्तांश",
+    9: "नवांश", 10: "दशांश", 12: "द्वादशांश", 16: "षोडशांश", 20: "विंशांश",
+    24: "चतुर्विंशांश", 27: "सप्तविंशांश", 30: "त्रिंशांश", 40: "खवेदांश",
+    45: "अक्षवेदांश", 60: "षष्ट्यंश"
+}
+DIVISIONS = np.array(list(VARGAS))
+
+# Trimsamsa: unequal parts (end degree, sign) for odd and even signs
+TRIMSAMSA = {
+    0: [(5, 0), (10, 10), (18, 8), (25, 2), (30, 6)],
+    1: [(5, 1), (12, 5), (20, 11), (25, 9), (30, 7)]
+}
+
+
+# ================= TABLES =================
+def varga_table(n):
+    """(12 x n) sign of each equal part of each sign in the Dn chart."""
+    s = np.arange(12)[:, None]
+    p = np.arange(n)[None, :]
+    odd = s % 2 == 0          # मेष, मिथुन, ... (0-based even)
+    quality = s % 3           # movable, fixed, dual
+    element = s % 4           # fire, earth, air, water
+
+    if n == 1:
+        start = s
+    elif n == 2:
+        # Sun's (सिंह) half first in odd signs, Moon's (कर्क) in even
+        return np.where(odd == (p == 0), 4, 3)
+    elif n in (3, 4):
+        # from the sign, stepping to its trines / kendras
+        return (s + (12 // n) * p) % 12
+    elif n == 7:
+        start = np.where(odd, s, s + 6)
+    elif n == 9:
+        # movable from itself, fixed from the 9th, dual from the 5th
+        start = 9 * s
+    elif n == 10:
+        start = np.where(odd, s, s + 8)
+    elif n in (12, 60):
+        start = s
+    elif n in (16, 45):
+        start = np.choose(quality, [0, 4, 8])
+    elif n == 20:
+        start = np.choose(quality, [0, 8, 4])
+    elif n == 24:
+        start = np.where(odd, 4, 3)
+    elif n == 27:
+        start = 3 * element
+    elif n == 30:
+        # one part per degree, read off the unequal Trimsamsa spans
+        out = np.empty((12, 30), dtype=np.int64)
+        for sign in range(12):
+            deg = 0
+            for end, target in TRIMSAMSA[sign % 2]:
+                out[sign, deg:end] = target
+                deg = end
+        return out
+    elif n == 40:
+        start = np.where(odd, 0, 6)
+    else:
+        raise ValueError(f"no D{n} rule")
+    return (start + p) % 12
+
+
+# (V x 12 x 60) every varga's table, padded to the longest
+VARGA_STACK = np.zeros((len(DIVISIONS), 12, DIVISIONS.max()), dtype=np.int8)
+for _v, _n in enumerate(DIVISIONS):
+    VARGA_STACK[_v, :, :_n] = varga_table(_n)
+
+
+def varga_columns(vargas=None):
+    # positions in DIVISIONS of the requested divisions (all by default)
+    if vargas is None:
+        return np.arange(len(DIVISIONS))
+    return np.searchsorted(DIVISIONS, vargas)
+
+
+# ================= ENGINE =================
+def varga_signs(lons, vargas=None):
+    """
+    Sign (0-11) of every longitude in every varga: lons of any shape ->
+    int8 array of shape lons.shape + (V,), V = len(vargas) (columns in
+    DIVISIONS order by default).
+    """
+    cols = varga_columns(vargas)
+    lons = np.asarray(lons, dtype=np.float64) % 360
+    sign = (lons // 30).astype(np.int64)
+    # part of the sign in each varga; 30 / n-degree parts
+    part = ((lons % 30)[..., None] * DIVISIONS[cols] / 30).astype(np.int64)
+    part = np.minimum(part, DIVISIONS[cols] - 1)
+    return VARGA_STACK[cols, sign[..., None], part]
+
+
+def chart_vargas(pos, lagna_deg, vargas=None):
+    """
+    One chart's varga matrix as a DataFrame: rows are the grahas in
+    `pos` plus "लग्न", columns "D<n>".
+    """
+    names = list(pos) + ["लग्न"]
+    signs = varga_signs([pos[p] for p in pos] + [lagna_deg], vargas)
+    cols = DIVISIONS[varga_columns(vargas)]
+    return pd.DataFrame(signs, index=names, columns=[f"D{n}" for n in cols])
+
+
+def varga_positions(pos, lagna_deg, n, matrix=None):
+    """
+    ({graha: sign * 30}, lagna sign * 30) in the Dn chart, the form the
+    kundali renderer takes; `matrix` reuses a chart_vargas result.
+    """
+    matrix = chart_vargas(pos, lagna_deg) if matrix is None else matrix
+    col = matrix[f"D{n}"]
+    return {p: int(col[p]) * 30 for p in pos}, int(col["लग्न"]) * 30
+
+
+def varga_ingresses(jds, lons, n, names=None):
+    """
+    Dn sign changes in a sampled series: jds (T), lons (T x N) ->
+    DataFrame of body, jd, from, to. Each change is placed by linear
+    interpolation to the part boundary crossed, so the sampling step
+    must be shorter than the time to cross one 30 / n-degree part.
+    """
+    jds = np.asarray(jds, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    names = GRAHA_NAMES[:lons.shape[1]] if names is None else names
+    signs = varga_signs(lons, [n])[..., 0]
+    width = 30.0 / n
+
+    t, b = np.nonzero(signs[1:] != signs[:-1])
+    l0, l1 = lons[t, b], lons[t + 1, b]
+    l1 = l0 + (l1 - l0 + 180) % 360 - 180   # unwrapped across 0°
+    boundary = (np.floor(np.minimum(l0, l1) / width) + 1) * width
+    frac = np.clip((boundary - l0) / (l1 - l0), 0.0, 1.0)
+
+    df = pd.DataFrame({
+        "body": np.asarray(names, dtype=object)[b],
+        "jd": jds[t] + frac * (jds[t + 1] - jds[t]),
+        "from": signs[t, b],
+        "to": signs[t + 1, b]
+    })
+    return df.sort_values("jd", ignore_index=True)
+
+
+if __name__ == "__main__":
+    import pytz
+
+    from dasha import RASHI_NAMES
+    from riseset import IST, jd_to_local, lagna, load_districts
+
+    parser = argparse.ArgumentParser(description="Print varga charts and ingresses")
+    parser.add_argument("--district", default="Ujjain")
+    parser.add_argument("--date", default=datetime.date.today().isoformat())
+    parser.add_argument("--time", default="06:00", help="IST")
+    parser.add_argument("--days", type=int, default=0, help="also list ingresses over this many days")
+    parser.add_argument("--varga", type=int, default=9, help="with --days: the division")
+    parser.add_argument("--step", type=float, default=1 / 24, help="with --days: sample step (days)")
+    args = parser.parse_args()
+
+    districts = load_districts()
+    row = districts[districts["District"].str.lower() == args.district.lower()].iloc[0]
+    dt = pytz.timezone(IST).localize(datetime.datetime.combine(
+        datetime.date.fromisoformat(args.date), datetime.time.fromisoformat(args.time)))
+    jd = datetime_to_jd(dt.astimezone(pytz.utc))
+
+    lons, _ = calc_grahas([jd])
+    pos = dict(zip(GRAHA_NAMES, lons[0]))
+    t0 = time.perf_counter()
+    matrix = chart_vargas(pos, lagna(jd, row["Latitude"], row["Longitude"]))
+    print(f"{len(matrix)} x {len(DIVISIONS)} vargas in {(time.perf_counter() - t0) * 1e3:.2f} ms")
+    print(matrix.apply(lambda col: col.map(RASHI_NAMES.__getitem__)).to_string())
+
+    if args.days:
+        jds = jd + np.arange(0, args.days, args.step)
+        t0 = time.perf_counter()
+        lons, _ = calc_grahas(jds)
+        df = varga_ingresses(jds, lons, args.varga)
+        print(f"\nD{args.varga}: {len(df)} ingresses over {args.days} days "
+              f"({len(jds)} samples) in {time.perf_counter() - t0:.2f}s")
+        df["time"] = jd_to_local(df["jd"].to_numpy())
+        df["from"] = df["from"].map(RASHI_NAMES.__getitem__)
+        df["to"] = df["to"].map(RASHI_NAMES.__getitem__)
+        print(df.drop(columns="jd").head(40).to_string(index=False))